@@ -1,15 +1,207 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import PermissionDenied
+from django.db.models.functions import Substr
+from django.forms.models import BaseInlineFormSet
+from django.http import QueryDict, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.text import Truncator, smart_split, unescape_string_literal
 
-from blog.models import Category, Comment, Location, Post
+from blog import autocomplete, stats
+from blog.changelist import KeysetChangeList
+from blog.counters import invalidate_comment_counts
+from blog.csv_export import csv_lines
+from blog.feeds import invalidate_feeds
+from blog.forms import PostAdminForm
+from blog.models import Category, Comment, DailyStats, Location, Post
+from blog.search import substring_search
 
 TEXT = 'Описание публикации.'
+TEXT_PREVIEW_LENGTH = 100
+
+User = get_user_model()
+
+
+class IndexedSearchMixin:
+    """
+    Поиск в списке объектов через текстовый индекс.
+    Разбор строки поиска и результат — как у стандартного
+    поиска по search_fields с icontains.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        bits = [
+            unescape_string_literal(bit)
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1] else bit
+            for bit in smart_split(search_term)
+        ]
+        if not bits:
+            return queryset, False
+        return substring_search(
+            queryset, self.get_search_fields(request), bits
+        ), False
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    Фильтр с полем ввода вместо списка всех значений:
+    боковая панель не читает таблицу целиком.
+    """
+
+    template = 'admin/blog/input_filter.html'
+    lookup = None
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def choices(self, changelist):
+        query = QueryDict(
+            changelist.get_query_string(remove=[self.parameter_name])[1:]
+        )
+        yield {
+            'hidden_params': [
+                (key, value)
+                for key in query
+                for value in query.getlist(key)
+            ],
+            'value': self.value() or '',
+        }
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if not value:
+            return queryset
+        return queryset.filter(**{self.lookup: value})
+
+
+class AuthorFilter(InputFilter):
+    """Имя пользователя сначала превращается в id по индексу username."""
+
+    title = 'автору'
+    parameter_name = 'author'
+
+    def queryset(self, request, queryset):
+        username = (self.value() or '').strip()
+        if not username:
+            return queryset
+        author_id = User.objects.filter(username=username).values_list(
+            'id', flat=True
+        ).first()
+        return queryset.filter(author_id=author_id)
+
+
+class TitleFilter(InputFilter):
+    title = 'началу заголовка'
+    parameter_name = 'title'
+    lookup = 'title__istartswith'
+
+
+class NameFilter(InputFilter):
+    title = 'началу названия'
+    parameter_name = 'name'
+    lookup = 'name__istartswith'
+
+
+class PublishActionsMixin:
+    """
+    Массовая публикация и снятие с публикации: один UPDATE на все
+    выбранные строки (или на все строки под фильтром) и один сброс
+    кэшей вместо сигнала на каждую строку.
+    """
+
+    def published_changed(self):
+        """
+        Сбрасывает кэши после массового изменения is_published.
+        По умолчанию сбрасывать нечего.
+        """
+
+    def _set_published(self, request, queryset, value, message):
+        changed = queryset.exclude(is_published=value).update(
+            is_published=value
+        )
+        if changed:
+            self.published_changed()
+        self.message_user(request, f'{message}: {changed}.')
+
+    @admin.action(description='Опубликовать выбранные')
+    def publish(self, request, queryset):
+        self._set_published(request, queryset, True, 'Опубликовано')
+
+    @admin.action(description='Снять с публикации выбранные')
+    def unpublish(self, request, queryset):
+        self._set_published(request, queryset, False, 'Снято с публикации')
+
+
+class CsvExportMixin:
+    """Выгрузка выбранных строк или всех строк под фильтром в CSV."""
+
+    @admin.action(description='Выгрузить выбранные в CSV')
+    def export_csv(self, request, queryset):
+        response = StreamingHttpResponse(
+            csv_lines(queryset), content_type='text/csv; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.opts.model_name}.csv"'
+        )
+        return response
+
+
+class SharedChoicesMixin:
+    """
+    Варианты выбора для list_editable полей-ссылок читаются из БД
+    один раз за запрос и разделяются всеми строками списка,
+    а не запрашиваются заново для каждой строки.
+    """
+
+    def get_changelist_form(self, request, **kwargs):
+        form = super().get_changelist_form(request, **kwargs)
+        choices = {}
+
+        class SharedChoicesForm(form):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                for name, field in self.fields.items():
+                    if not hasattr(field, 'queryset'):
+                        continue
+                    if name not in choices:
+                        choices[name] = list(field.choices)
+                    field.choices = choices[name]
+                    widget = field.widget
+                    while widget is not None:
+                        widget.choices = choices[name]
+                        widget = getattr(widget, 'widget', None)
+
+        return SharedChoicesForm
+
+
+class PostChangeList(KeysetChangeList):
+    """
+    Список постов без полного текста: начало обрезается в SQL.
+    Лишний символ показывает, что текст длиннее превью.
+    """
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            short_text=Substr('text', 1, TEXT_PREVIEW_LENGTH + 1)
+        ).defer('text')
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    IndexedSearchMixin, SharedChoicesMixin, PublishActionsMixin,
+    CsvExportMixin, admin.ModelAdmin,
+):
     list_display = (
         'title',
-        'text',
+        'short_text',
         'is_published',
         'category',
         'location',
@@ -21,9 +213,13 @@ class PostAdmin(admin.ModelAdmin):
         'category',
         'location',
     )
-    search_fields = ('title',)
+    search_fields = ('title', 'text')
     list_filter = ('category',)
     list_display_links = ('title',)
+    list_select_related = ('category', 'location')
+    actions = ('publish', 'unpublish', 'export_csv')
+    form = PostAdminForm
+    autocomplete_fields = ('author', 'category', 'location')
     fieldsets = (
         ('Блок-1', {
             'fields': ('title', 'author', 'is_published',),
@@ -35,17 +231,121 @@ class PostAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def published_changed(self):
+        invalidate_feeds()
+        invalidate_comment_counts()
+        autocomplete.index.expire()
+
+    def get_autocomplete_fields(self, request):
+        """
+        В форме поста — поиск по мере ввода. В списке постов
+        остаются обычные списки выбора: они общие для всех строк,
+        а автодополнение запрашивало бы выбранное значение построчно.
+        """
+        match = request.resolver_match
+        if match and match.url_name.endswith('_changelist'):
+            return ()
+        return super().get_autocomplete_fields(request)
+
+    @admin.display(description='Текст', ordering='text')
+    def short_text(self, post):
+        return Truncator(post.short_text).chars(TEXT_PREVIEW_LENGTH)
+
+
+class RecentPostsFormSet(BaseInlineFormSet):
+    """
+    Одна страница последних публикаций вместо всех сразу.
+    page и page_size выставляет PostInline.get_formset.
+    """
+
+    page = 1
+    page_size = 20
+    page_param = 'posts_page'
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            posts = self.queryset.order_by('-pub_date', '-id')
+            start = (self.page - 1) * self.page_size
+            ids = list(posts.values_list('pk', flat=True)[
+                start:start + self.page_size
+            ])
+            self._queryset = posts.filter(pk__in=ids)
+        return self._queryset
+
+    @cached_property
+    def total(self):
+        return self.queryset.count()
+
+    @property
+    def first_number(self):
+        return (self.page - 1) * self.page_size + 1
+
+    @property
+    def last_number(self):
+        return min(self.page * self.page_size, self.total)
+
+    @property
+    def has_next(self):
+        return self.page * self.page_size < self.total
+
 
 class PostInline(admin.TabularInline):
     model = Post
     extra = 0
+    autocomplete_fields = ('author', 'category', 'location')
+    formset = RecentPostsFormSet
+    template = 'admin/blog/recent_posts_inline.html'
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        try:
+            page = max(int(request.GET.get(formset.page_param, 1)), 1)
+        except ValueError:
+            page = 1
+        formset.page = page
+        formset.page_size = settings.ADMIN_INLINE_POSTS
+        return formset
+
+
+class PostInlineAdminMixin:
+    """
+    Публикации на странице категории или местоположения:
+    постранично, либо только их число со ссылкой на список,
+    если ADMIN_INLINE_POSTS = 0.
+    """
+
+    post_filter = None
+
+    def get_inlines(self, request, obj):
+        if not settings.ADMIN_INLINE_POSTS:
+            return ()
+        return (PostInline,)
+
+    def get_readonly_fields(self, request, obj=None):
+        readonly_fields = super().get_readonly_fields(request, obj)
+        if settings.ADMIN_INLINE_POSTS:
+            return readonly_fields
+        return (*readonly_fields, 'post_count')
+
+    @admin.display(description='Публикации')
+    def post_count(self, obj):
+        if obj.pk is None:
+            return '—'
+        return format_html(
+            '<a href="{}?{}={}">{}</a>',
+            reverse('admin:blog_post_changelist'),
+            self.post_filter,
+            obj.pk,
+            obj.posts.count(),
+        )
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
-    inlines = (
-        PostInline,
-    )
+class CategoryAdmin(PostInlineAdminMixin, admin.ModelAdmin):
+    post_filter = 'category__id__exact'
     list_display = (
         'title',
         'slug',
@@ -53,28 +353,119 @@ class CategoryAdmin(admin.ModelAdmin):
         'description',
         'created_at',
     )
-    list_filter = ('title',)
+    list_filter = (TitleFilter,)
+    search_fields = ('title',)
+    ordering = ('title',)
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
-    inlines = (
-        PostInline,
-    )
+class LocationAdmin(PostInlineAdminMixin, admin.ModelAdmin):
+    post_filter = 'location__id__exact'
     list_display = (
         'name',
         'is_published',
     )
-    list_filter = ('name',)
+    list_filter = (NameFilter,)
+    search_fields = ('name',)
+    ordering = ('name',)
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(
+    IndexedSearchMixin, PublishActionsMixin, CsvExportMixin,
+    admin.ModelAdmin,
+):
     list_display = (
         'text',
         'author',
         'is_published',
         'created_at',
     )
-    list_filter = ('author',)
+    search_fields = ('text',)
+    list_filter = (AuthorFilter,)
     list_editable = ('is_published',)
+    actions = ('publish', 'unpublish', 'export_csv')
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def published_changed(self):
+        invalidate_comment_counts()
+
+
+@admin.register(DailyStats)
+class StatsAdmin(admin.ModelAdmin):
+    """
+    Страница статистики вместо списка строк. Данные берутся из
+    сводных таблиц, которые обновляет команда aggregate_stats.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        period = request.GET.get('period')
+        if period not in stats.PERIODS:
+            period = stats.DEFAULT_PERIOD
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Статистика',
+            'opts': self.model._meta,
+            'periods': {
+                key: label for key, (label, _) in stats.PERIODS.items()
+            },
+            'period': period,
+            'chart_width': stats.CHART_WIDTH,
+            'chart_height': stats.CHART_HEIGHT,
+            **(extra_context or {}),
+        }
+        period_range = stats.period_range(period)
+        if period_range is not None:
+            start, end = period_range
+            posts, comments = stats.daily_series(start, end)
+            context.update({
+                'start': start,
+                'end': end,
+                'total_posts': sum(posts),
+                'total_comments': sum(comments),
+                'posts_points': stats.chart_points(stats.resample(posts)),
+                'comments_points': stats.chart_points(
+                    stats.resample(comments)
+                ),
+                'top_authors': stats.top_authors(start, end),
+                'top_categories': stats.top_categories(start, end),
+            })
+        return TemplateResponse(request, 'admin/blog/stats.html', context)
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class BlogUserAdmin(UserAdmin):
+    """
+    В автодополнении полей автора пользователи ищутся по началу
+    имени с учётом регистра: условие записано диапазоном и идёт по
+    уникальному индексу username. В списке пользователей остаётся
+    обычный поиск по имени, фамилии и почте.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if request.path != reverse('admin:autocomplete'):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(
+            username__gte=term, username__lt=term + '\U0010ffff'
+        ), False
@@ -0,0 +1,171 @@
+"""
+Сериализация постов для JSON API: выбор полей, курсоры
+и потоковая запись ответа.
+"""
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, CharField, F, Q, When
+from django.utils.http import quote_etag
+
+from blog.models import Comment, Post
+
+API_VERSION = 'v1'
+# Поле ответа → поле запроса values_list.
+API_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'api_location',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+# Поля ключа сортировки; по ним строится курсор.
+CURSOR_FIELDS = ('pub_date', 'id')
+API_ORDERING = ('-pub_date', '-id')
+API_MAX_LIMIT = 100
+
+
+def parse_fields(value):
+    """Поля из параметра ?fields=; без параметра — все."""
+    if not value:
+        return tuple(API_FIELDS)
+    names = tuple(dict.fromkeys(
+        name.strip() for name in value.split(',') if name.strip()
+    ))
+    unknown = [name for name in names if name not in API_FIELDS]
+    if unknown or not names:
+        raise ValueError(f'Неизвестные поля: {", ".join(unknown)}.')
+    return names
+
+
+def parse_limit(value, default):
+    if not value:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('Параметр limit должен быть числом.')
+    if not 1 <= limit <= API_MAX_LIMIT:
+        raise ValueError(
+            f'Параметр limit должен быть от 1 до {API_MAX_LIMIT}.'
+        )
+    return limit
+
+
+def encode_cursor(moment, pk):
+    """Курсор по паре (дата, id) последней отданной строки."""
+    value = f'{moment.isoformat()}|{pk}'.encode()
+    return urlsafe_b64encode(value).decode().rstrip('=')
+
+
+def parse_cursor(cursor):
+    try:
+        value = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        moment, pk = value.decode().split('|')
+        return datetime.fromisoformat(moment), int(pk)
+    except (Base64Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Некорректный курсор.')
+
+
+def decode_cursor(cursor):
+    """Условие «строго после курсора» в порядке API_ORDERING."""
+    pub_date, pk = parse_cursor(cursor)
+    return Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+
+
+def post_values(queryset, fields):
+    """
+    values_list с запрошенными полями и полями курсора в конце.
+    Местоположение отдаём, только если оно опубликовано, как в шаблонах.
+    """
+    if 'location' in fields:
+        queryset = queryset.annotate(api_location=Case(
+            When(location__is_published=True, then=F('location__name')),
+            output_field=CharField(),
+        ))
+    return queryset.values_list(
+        *(API_FIELDS[name] for name in fields), *CURSOR_FIELDS
+    )
+
+
+def serialize(fields, row):
+    item = dict(zip(fields, row))
+    if 'image' in item:
+        item['image'] = (
+            settings.MEDIA_URL + item['image'] if item['image'] else None
+        )
+    return item
+
+
+def make_etag(items):
+    digest = hashlib.sha1()
+    for item in items:
+        digest.update(repr(sorted(item.items())).encode())
+    return quote_etag(digest.hexdigest())
+
+
+def encode(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def stream_page(items, next_url):
+    """
+    Тело ответа списка по одному посту: целиком JSON
+    в памяти не собирается.
+    """
+    yield '{"results": ['
+    for number, item in enumerate(items):
+        yield (',' if number else '') + encode(item)
+    yield f'], "next": {encode(next_url)}}}'
+
+
+EXPORT_CHUNK_SIZE = 500
+# Разделы выгрузки по порядку: тип записи → (модель, поля).
+EXPORT_SECTIONS = {
+    'post': (Post, (
+        'id', 'title', 'text', 'pub_date', 'created_at', 'is_published',
+        'category__slug', 'location__name', 'image',
+    )),
+    'comment': (Comment, (
+        'id', 'post_id', 'text', 'created_at', 'is_published',
+    )),
+}
+
+
+def parse_export_cursor(cursor):
+    """Курсор выгрузки — «тип:id» последней полученной записи."""
+    if not cursor:
+        return next(iter(EXPORT_SECTIONS)), 0
+    kind, _, pk = cursor.partition(':')
+    if kind not in EXPORT_SECTIONS or not pk.isdigit():
+        raise ValueError('Некорректный курсор.')
+    return kind, int(pk)
+
+
+def export_lines(user, kind, after):
+    """
+    NDJSON со всеми постами и комментариями пользователя.
+    Строки читаются из БД порциями по EXPORT_CHUNK_SIZE, у каждой
+    записи есть cursor: с него выгрузку можно продолжить.
+    """
+    kinds = list(EXPORT_SECTIONS)
+    for section in kinds[kinds.index(kind):]:
+        model, fields = EXPORT_SECTIONS[section]
+        rows = model.objects.filter(
+            author=user, id__gt=after if section == kind else 0
+        ).order_by('id').values_list(*fields)
+        names = [field.replace('__', '_') for field in fields]
+        for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            item = serialize(names, row)
+            item['type'] = section
+            item['cursor'] = f'{section}:{item["id"]}'
+            yield encode(item) + '\n'
@@ -0,0 +1,327 @@
+"""
+Подсказки для строки поиска: заголовки постов, категории и @username.
+Индекс — отсортированные списки ключей в памяти процесса, поиск
+по префиксу делается через bisect без запросов к БД.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+POST = 'post'
+CATEGORY = 'category'
+USER = 'user'
+KINDS = (CATEGORY, USER, POST)
+# Сколько слов заголовка индексировать: подсказка находит
+# пост по началу любого из первых слов.
+MAX_KEY_WORDS = 8
+CHUNK_SIZE = 2000
+VERSION_KEY = 'blog:autocomplete:version'
+
+
+def _shared_version():
+    return cache.get_or_set(VERSION_KEY, time.time_ns(), None)
+
+
+def _bump_shared_version():
+    """Новая версия или None, если ключа в кэше не было."""
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+        return None
+
+
+def normalize(text):
+    return ' '.join(text.lower().replace('ё', 'е').split())
+
+
+def title_keys(title):
+    words = normalize(title).split()[:MAX_KEY_WORDS]
+    return {' '.join(words[start:]) for start in range(len(words))}
+
+
+def username_keys(username):
+    return {normalize(username)}
+
+
+class AutocompleteIndex:
+    """
+    Для каждого типа — отсортированный список пар (ключ, pk),
+    данные для ответа — в словаре по pk.
+    Индекс обновляется сигналами, а целиком его перестраивает
+    фоновый поток раз в AUTOCOMPLETE_REFRESH секунд, чтобы подхватить
+    изменения из других процессов. Скрытие и удаление меняют версию
+    в общем кэше: её поток проверяет раз в AUTOCOMPLETE_POLL секунд,
+    так что скрытое пропадает из подсказок всех процессов быстро.
+    Запросы к БД в потоке запроса не выполняются: пока индекс
+    строится, поиск отвечает по старому.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._keys = {kind: [] for kind in KINDS}
+        self._items = {kind: {} for kind in KINDS}
+        self._hidden_categories = set()
+        self._built_at = None
+        self._version = None
+        # Изменения, пришедшие во время перестройки: они применяются
+        # к новому индексу, иначе снимок из БД их бы потерял.
+        self._pending = None
+        self._thread = None
+        self._wakeup = threading.Event()
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def start(self):
+        """Запускает фоновое обновление индекса, если оно ещё не идёт."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._refresh_loop, name='autocomplete', daemon=True
+            )
+            self._thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except (DatabaseError, OSError):
+                logger.exception('Не удалось перестроить индекс подсказок.')
+            finally:
+                close_old_connections()
+            self._wakeup.wait(settings.AUTOCOMPLETE_POLL)
+            self._wakeup.clear()
+
+    def is_stale(self):
+        """
+        Индекс не построен, устарел по сроку или другой процесс
+        что-то скрыл после последней перестройки.
+        """
+        return (
+            not self.is_built
+            or time.monotonic() - self._built_at
+            >= settings.AUTOCOMPLETE_REFRESH
+            or _shared_version() != self._version
+        )
+
+    def refresh(self):
+        if self.is_stale():
+            self.rebuild()
+
+    def _snapshot(self):
+        keys = {kind: [] for kind in KINDS}
+        items = {kind: {} for kind in KINDS}
+        hidden = set()
+        categories = Category.objects.values_list(
+            'id', 'title', 'slug', 'is_published'
+        )
+        for pk, title, slug, is_published in categories.iterator(
+                chunk_size=CHUNK_SIZE):
+            if not is_published:
+                hidden.add(pk)
+                continue
+            items[CATEGORY][pk] = (title, slug)
+            keys[CATEGORY].extend((key, pk) for key in title_keys(title))
+        # Скрытые категории и отложенные посты отсекаются при поиске.
+        posts = Post.objects.filter(is_published=True).values_list(
+            'id', 'title', 'pub_date', 'category_id'
+        )
+        for pk, title, pub_date, category_id in posts.iterator(
+                chunk_size=CHUNK_SIZE):
+            items[POST][pk] = (title, pub_date, category_id)
+            keys[POST].extend((key, pk) for key in title_keys(title))
+        users = User.objects.filter(is_active=True).values_list(
+            'id', 'username'
+        )
+        for pk, username in users.iterator(chunk_size=CHUNK_SIZE):
+            items[USER][pk] = (username,)
+            keys[USER].extend((key, pk) for key in username_keys(username))
+        for kind_keys in keys.values():
+            kind_keys.sort()
+        return keys, items, hidden
+
+    def rebuild(self):
+        """
+        Строит индекс из БД и подменяет им текущий; одновременно
+        идёт только одна перестройка. Изменения, записанные сигналами
+        за время построения, применяются к новому индексу.
+        """
+        with self._rebuild_lock:
+            # Версию читаем до снимка: изменение, пришедшее во время
+            # построения, вызовет ещё одну перестройку, но не потеряется.
+            version = _shared_version()
+            with self._lock:
+                self._pending = []
+            try:
+                keys, items, hidden = self._snapshot()
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+            with self._lock:
+                self._keys = keys
+                self._items = items
+                self._hidden_categories = hidden
+                for change in self._pending:
+                    self._apply(*change)
+                self._pending = None
+                self._built_at = time.monotonic()
+                self._version = version
+
+    def expire(self):
+        """
+        Помечает индекс устаревшим во всех процессах: их фоновые
+        потоки перестроят его при следующей проверке версии,
+        а поток этого процесса — сразу.
+        """
+        _bump_shared_version()
+        self._wakeup.set()
+
+    def _hide(self):
+        """
+        Скрытое уже убрано из индекса этого процесса: меняем версию
+        для остальных, а свою перестройку не запускаем.
+        """
+        version = _bump_shared_version()
+        with self._lock:
+            if version is not None and self._version == version - 1:
+                self._version = version
+
+    def _remove(self, kind, pk):
+        item = self._items[kind].pop(pk, None)
+        if item is None:
+            return
+        keys = self._keys[kind]
+        make_keys = username_keys if kind == USER else title_keys
+        for key in make_keys(item[0]):
+            index = bisect_left(keys, (key, pk))
+            if index < len(keys) and keys[index] == (key, pk):
+                del keys[index]
+
+    def _add(self, kind, pk, item):
+        self._items[kind][pk] = item
+        make_keys = username_keys if kind == USER else title_keys
+        for key in make_keys(item[0]):
+            insort(self._keys[kind], (key, pk))
+
+    def _apply(self, kind, pk, item):
+        if kind == CATEGORY:
+            if item is None:
+                self._hidden_categories.add(pk)
+            else:
+                self._hidden_categories.discard(pk)
+        self._remove(kind, pk)
+        if item is not None:
+            self._add(kind, pk, item)
+
+    def _update(self, kind, pk, item):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((kind, pk, item))
+            if self.is_built:
+                self._apply(kind, pk, item)
+        if item is None:
+            self._hide()
+
+    def update_post(self, post):
+        self._update(POST, post.pk, (
+            (post.title, post.pub_date, post.category_id)
+            if post.is_published else None
+        ))
+
+    def update_category(self, category):
+        self._update(CATEGORY, category.pk, (
+            (category.title, category.slug)
+            if category.is_published else None
+        ))
+
+    def update_user(self, user):
+        self._update(
+            USER, user.pk, (user.username,) if user.is_active else None
+        )
+
+    def remove(self, kind, pk):
+        self._update(kind, pk, None)
+
+    def _visible(self, kind, item, now):
+        if kind != POST:
+            return True
+        _, pub_date, category_id = item
+        return (
+            pub_date <= now
+            and category_id is not None
+            and category_id not in self._hidden_categories
+        )
+
+    def _search_kind(self, kind, prefix, limit, now):
+        keys, items = self._keys[kind], self._items[kind]
+        seen = set()
+        index = bisect_left(keys, (prefix,))
+        while index < len(keys) and len(seen) < limit:
+            key, pk = keys[index]
+            index += 1
+            if not key.startswith(prefix):
+                break
+            item = items.get(pk)
+            if (item is None or pk in seen
+                    or not self._visible(kind, item, now)):
+                continue
+            seen.add(pk)
+            yield self._result(kind, pk, item)
+
+    def search(self, query, limit):
+        """
+        До limit подсказок по префиксу: сначала категории,
+        затем пользователи и посты. Запрос с @ ищет только
+        пользователей.
+        """
+        self.start()
+        kinds = KINDS
+        if query.startswith('@'):
+            query, kinds = query[1:], (USER,)
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        now = timezone.now()
+        results = []
+        with self._lock:
+            for kind in kinds:
+                results.extend(self._search_kind(
+                    kind, prefix, limit - len(results), now
+                ))
+                if len(results) >= limit:
+                    break
+        return results
+
+    @staticmethod
+    def _result(kind, pk, item):
+        if kind == POST:
+            label = item[0]
+            url = reverse('blog:post_detail', args=[pk])
+        elif kind == CATEGORY:
+            label = item[0]
+            url = reverse('blog:category_posts', args=[item[1]])
+        else:
+            label = f'@{item[0]}'
+            url = reverse('blog:profile', args=[item[0]])
+        return {'type': kind, 'label': label, 'url': url}
+
+
+index = AutocompleteIndex()
@@ -0,0 +1,111 @@
+"""Общие функции для команд замера производительности."""
+import multiprocessing
+import os
+import platform
+import resource
+import tempfile
+import time
+
+import django
+import PIL
+from PIL import Image
+
+ASPECT_RATIO = 4 / 3
+NOISE_SIGMA = 40
+
+
+def peak_rss_kib():
+    """
+    Пик памяти процесса в КиБ.
+    ru_maxrss в Linux наследуется через exec от родителя,
+    поэтому там берём VmHWM текущего адресного пространства.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def environment():
+    """Версии и железо, чтобы сравнивать результаты между релизами."""
+    return {
+        'timestamp': int(time.time()),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'pillow': PIL.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def make_image(directory, megapixels, image_format='JPEG'):
+    """
+    Синтетическое фото: градиент с шумом сжимается примерно
+    как настоящий снимок, а не как заливка одним цветом.
+    """
+    height = int((megapixels * 10 ** 6 / ASPECT_RATIO) ** 0.5)
+    width = int(height * ASPECT_RATIO)
+    size = (width, height)
+    image = Image.merge('RGB', (
+        Image.effect_noise(size, NOISE_SIGMA),
+        Image.linear_gradient('L').resize(size),
+        Image.effect_noise(size, NOISE_SIGMA // 2),
+    ))
+    exif = Image.Exif()
+    exif[0x010F] = 'Blogicum benchmark'
+    path = os.path.join(
+        directory, f'{megapixels}mp.{image_format.lower()}'
+    )
+    image.save(path, image_format, quality=90, exif=exif.tobytes())
+    return path, width, height
+
+
+def _measure_upload(path, mode, queue):
+    """Замер в отдельном процессе, чтобы пики не накладывались."""
+    django.setup()
+    from django.core.files.uploadedfile import UploadedFile
+
+    from blog.forms import PostForm
+
+    before = peak_rss_kib()
+    with open(path, 'rb') as fp:
+        if mode == 'stream':
+            upload = UploadedFile(
+                fp, name=os.path.basename(path),
+                size=os.path.getsize(path),
+            )
+            # Форма целиком: clean_image ещё строит превью.
+            # Остальные поля пустые, но изображение проверяется
+            # независимо; отказ по лимитам тоже обходится
+            # без декодирования.
+            form = PostForm(data={}, files={'image': upload})
+            form.is_valid()
+            image = form.cleaned_data.get('image')
+            if image is not None:
+                with tempfile.TemporaryFile() as out:
+                    for chunk in image.chunks():
+                        out.write(chunk)
+        else:
+            Image.open(fp).load()
+    queue.put(peak_rss_kib() - before)
+
+
+def measure_upload_memory(path, mode):
+    """
+    Прирост пиковой памяти в КиБ при загрузке файла:
+    'stream' — путь PostForm, 'decode' — полное декодирование.
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(
+        target=_measure_upload, args=(path, mode, queue)
+    )
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f'Замер {mode} для {path} завершился с ошибкой.')
+    return queue.get()
@@ -0,0 +1,28 @@
+"""
+Файловый кэш для нескольких процессов.
+Стандартный FileBasedCache перед каждой записью перечисляет весь
+каталог кэша, чтобы проверить MAX_ENTRIES: set_many на 200 счётчиков
+комментариев обходил бы каталог 200 раз. Здесь переполнение
+проверяется раз в CULL_EVERY записей процесса.
+"""
+from django.core.cache.backends import filebased
+
+CULL_EVERY = 100
+
+
+class FileBasedCache(filebased.FileBasedCache):
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_every = int(
+            params.get('OPTIONS', {}).get('CULL_EVERY', CULL_EVERY)
+        )
+        self._writes = 0
+
+    def _cull(self):
+        # Между проверками каталог может вырасти не больше чем
+        # на CULL_EVERY файлов от каждого процесса.
+        self._writes += 1
+        if self._writes % self._cull_every:
+            return
+        super()._cull()
@@ -0,0 +1,193 @@
+"""
+Список объектов в админке без COUNT(*) по всей таблице.
+Без фильтров число строк берётся из статистики БД, с фильтрами —
+считается не дальше ADMIN_COUNT_CAP. В порядке по умолчанию
+страницы листаются по ключу сортировки, а не через OFFSET.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import DatabaseError, connection
+from django.db.models import Q
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+
+
+def estimated_count(model):
+    """
+    Число строк таблицы по статистике планировщика или None,
+    если статистики нет (ANALYZE не запускался).
+    """
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    return count if count >= 0 else None
+
+
+def capped_count(queryset, cap):
+    """Точное число строк, но не больше cap + 1."""
+    return queryset.order_by().values('pk')[:cap + 1].count()
+
+
+def _keyset_filter(ordering, values, backwards):
+    """Строки строго после values в порядке ordering (или до них)."""
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') != backwards else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return condition
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Список с оценкой числа строк и постраничной навигацией
+    по курсору ?after= / ?before=. При сортировке по столбцу
+    остаются обычные номера страниц с той же оценкой числа строк.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        """Курсор переносится только в ссылки навигации."""
+        return super().get_query_string(
+            new_params, [*(remove or ()), AFTER_VAR, BEFORE_VAR]
+        )
+
+    def count_results(self):
+        """(число строк, подпись для списка)."""
+        cap = settings.ADMIN_COUNT_CAP
+        if not self.has_active_filters and not self.query:
+            estimate = estimated_count(self.model)
+            if estimate is not None and estimate > cap:
+                return estimate, f'≈ {estimate:,}'.replace(',', ' ')
+        count = capped_count(self.queryset, cap)
+        if count > cap:
+            return cap, f'{cap:,}+'.replace(',', ' ')
+        return count, str(count)
+
+    def get_results(self, request):
+        self.result_count, self.result_count_label = self.count_results()
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        self.paginator.count = self.result_count
+        fields = self._keyset_fields()
+        self.keyset = fields is not None
+        if self.keyset:
+            self.get_keyset_results(fields)
+            return
+        self.multi_page = self.result_count > self.list_per_page
+        try:
+            self.result_list = self.paginator.page(self.page_num).object_list
+        except InvalidPage:
+            raise IncorrectLookupParameters
+
+    def _keyset_fields(self):
+        """
+        Поля порядка по умолчанию или None, если выбран столбец
+        сортировки или порядок нельзя продолжить по курсору:
+        он задан выражениями, полями связанных моделей или не
+        заканчивается первичным ключом.
+        """
+        if ORDER_VAR in self.params:
+            return None
+        pk_name = self.lookup_opts.pk.name
+        fields = []
+        for field in self.queryset.query.order_by:
+            if not isinstance(field, str) or '__' in field:
+                return None
+            if field.lstrip('-') == 'pk':
+                field = field.replace('pk', pk_name, 1)
+            fields.append(field)
+        if not fields or fields[-1].lstrip('-') != pk_name:
+            return None
+        return fields
+
+    def encode_keyset(self, row):
+        # str, а не DjangoJSONEncoder: тот обрезает микросекунды.
+        value = json.dumps(row, default=str).encode()
+        return urlsafe_b64encode(value).decode().rstrip('=')
+
+    def decode_keyset(self, fields, cursor):
+        try:
+            values = json.loads(
+                urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            )
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [
+                self.lookup_opts.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(fields, values)
+            ]
+        except (Base64Error, UnicodeDecodeError, ValueError,
+                ValidationError):
+            raise IncorrectLookupParameters
+
+    def get_keyset_results(self, fields):
+        """
+        Страница по курсору: ключи строк читаются с запасом в одну
+        строку, чтобы узнать, есть ли следующая страница.
+        """
+        names = [field.lstrip('-') for field in fields]
+        after = self.params.get(AFTER_VAR)
+        before = self.params.get(BEFORE_VAR)
+        queryset = self.queryset
+        if before:
+            queryset = queryset.filter(_keyset_filter(
+                fields, self.decode_keyset(fields, before), True
+            )).reverse()
+        elif after:
+            queryset = queryset.filter(_keyset_filter(
+                fields, self.decode_keyset(fields, after), False
+            ))
+        rows = list(
+            queryset.values_list(*names)[:self.list_per_page + 1]
+        )
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if before:
+            rows.reverse()
+        has_next = bool(before) or has_more
+        has_previous = bool(after) or (bool(before) and has_more)
+        self.result_list = self.queryset.filter(
+            pk__in=[row[-1] for row in rows]
+        )
+        self.multi_page = has_next or has_previous
+        self.keyset_first_url = has_previous and self.get_query_string()
+        self.keyset_previous_url = has_previous and rows and (
+            self.get_query_string({BEFORE_VAR: self.encode_keyset(rows[0])})
+        )
+        self.keyset_next_url = has_next and rows and (
+            self.get_query_string({AFTER_VAR: self.encode_keyset(rows[-1])})
+        )
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Ленты и число комментариев сбрасываются версией в кэше.
+    С кэшем в памяти процесса сброс виден только одному воркеру,
+    остальные отдают устаревшие данные.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [Error(
+        'Кэш по умолчанию хранится в памяти процесса.',
+        hint='Укажите в CACHES общий кэш: файловый, Redis или memcached.',
+        id='blog.E001',
+    )]
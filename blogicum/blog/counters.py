@@ -0,0 +1,81 @@
+"""
+Число комментариев для набора постов.
+Значения для постов, видимых всем, кэшируются по одному ключу на пост;
+промахи считаются одним запросом с GROUP BY. Кэш общий для всех
+процессов (см. CACHES и проверку blog.E001), иначе сброс после
+скрытия поста не дошёл бы до других воркеров.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Count, ExpressionWrapper
+
+from blog.models import Post, PostQuerySet
+
+COUNTS_MAX_IDS = 200
+COUNTS_VERSION_KEY = 'blog:comment_counts:version'
+
+
+def _version():
+    return cache.get_or_set(COUNTS_VERSION_KEY, time.time_ns(), None)
+
+
+def _key(version, post_id):
+    return f'blog:comment_count:{version}:{post_id}'
+
+
+def parse_ids(value):
+    try:
+        ids = {int(pk) for pk in value.split(',') if pk.strip()}
+    except ValueError:
+        raise ValueError('Параметр ids — номера постов через запятую.')
+    if not 1 <= len(ids) <= COUNTS_MAX_IDS:
+        raise ValueError(f'Укажите от 1 до {COUNTS_MAX_IDS} постов.')
+    return ids
+
+
+def comment_counts(user, ids):
+    """
+    {id поста: число комментариев} для постов, видимых user.
+    Чужие скрытые посты в ответ не попадают.
+    """
+    version = _version()
+    keys = {_key(version, pk): pk for pk in ids}
+    counts = {
+        keys[key]: count for key, count in cache.get_many(keys).items()
+    }
+    missing = ids - counts.keys()
+    if not missing:
+        return counts
+    rows = (
+        Post.objects.visible_to(user)
+        .filter(pk__in=missing)
+        .order_by()
+        .annotate(
+            count=Count('comments'),
+            is_public=ExpressionWrapper(
+                PostQuerySet.published_filter(), output_field=BooleanField()
+            ),
+        )
+        .values_list('pk', 'count', 'is_public')
+    )
+    public = {}
+    for pk, count, is_public in rows:
+        counts[pk] = count
+        if is_public:
+            public[_key(version, pk)] = count
+    cache.set_many(public, settings.COMMENT_COUNT_CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate_comment_count(post_id):
+    cache.delete(_key(_version(), post_id))
+
+
+def invalidate_comment_counts():
+    """Сбрасывает все значения: видимость постов могла измениться."""
+    try:
+        cache.incr(COUNTS_VERSION_KEY)
+    except ValueError:
+        cache.set(COUNTS_VERSION_KEY, time.time_ns(), None)
@@ -0,0 +1,100 @@
+"""
+Выгрузка постов и комментариев в CSV.
+Строки читаются из БД итератором порциями по CHUNK_SIZE, названия
+связанных объектов подставляются одним запросом на порцию, поэтому
+память не растёт с числом строк.
+Файл начинается с BOM, чтобы Excel узнал UTF-8, а текстовые ячейки,
+похожие на формулу, экранируются апострофом.
+"""
+import csv
+from itertools import islice
+
+from blog.models import Category, Comment, Location, Post, User
+
+CHUNK_SIZE = 2000
+BOM = '\ufeff'
+# С этих символов табличные редакторы начинают формулу.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Поле-ссылка → (модель, поле с названием).
+RELATED_NAMES = {
+    'author_id': (User, 'username'),
+    'category_id': (Category, 'title'),
+    'location_id': (Location, 'name'),
+}
+# Модель → колонки (заголовок, поле values_list).
+CSV_COLUMNS = {
+    Post: (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('author', 'author_id'),
+        ('category', 'category_id'),
+        ('location', 'location_id'),
+        ('pub_date', 'pub_date'),
+        ('created_at', 'created_at'),
+        ('is_published', 'is_published'),
+        ('text', 'text'),
+    ),
+    Comment: (
+        ('id', 'id'),
+        ('post_id', 'post_id'),
+        ('author', 'author_id'),
+        ('created_at', 'created_at'),
+        ('is_published', 'is_published'),
+        ('text', 'text'),
+    ),
+}
+
+
+class Echo:
+    """Файл для csv.writer, который возвращает строку, а не пишет её."""
+
+    def write(self, value):
+        return value
+
+
+def escape_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _names(field, ids):
+    model, name = RELATED_NAMES[field]
+    return dict(
+        model.objects.filter(pk__in=ids).values_list('pk', name)
+    )
+
+
+def csv_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Заголовок и строки выгрузки queryset."""
+    headers, fields = zip(*CSV_COLUMNS[queryset.model])
+    yield headers
+    related = [
+        (position, field) for position, field in enumerate(fields)
+        if field in RELATED_NAMES
+    ]
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        names = {
+            position: _names(field, {
+                row[position] for row in chunk
+                if row[position] is not None
+            })
+            for position, field in related
+        }
+        for row in chunk:
+            row = list(row)
+            for position, lookup in names.items():
+                row[position] = lookup.get(row[position], '')
+            yield [escape_cell(value) for value in row]
+
+
+def csv_lines(queryset, chunk_size=CHUNK_SIZE):
+    """Строки CSV-файла по одной: для StreamingHttpResponse."""
+    writer = csv.writer(Echo())
+    yield BOM
+    for row in csv_rows(queryset, chunk_size):
+        yield writer.writerow(row)
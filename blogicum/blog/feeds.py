@@ -0,0 +1,175 @@
+"""
+RSS и Atom ленты публикаций.
+Готовый документ ленты хранится в кэше до изменения видимых постов;
+повторные опросы с If-None-Match / If-Modified-Since получают 304.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Min
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+
+from blog.models import Category, Post, User
+
+FEED_ITEMS = 20
+FEED_DESCRIPTION_WORDS = 50
+FEED_VERSION_KEY = 'blog:feeds:version'
+FEED_CACHE_PREFIX = 'blog:feed'
+
+
+def feed_version():
+    return cache.get_or_set(FEED_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_feeds():
+    """Сбрасывает все ленты разом: ключи с прошлой версией не читаются."""
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.set(FEED_VERSION_KEY, time.time_ns(), None)
+
+
+def cache_timeout():
+    """
+    Время жизни документа: не дольше FEED_CACHE_TIMEOUT и не
+    дольше, чем до выхода ближайшей отложенной публикации —
+    её появление сигналы не заметят.
+    """
+    now = timezone.now()
+    next_pub_date = Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__gt=now,
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    timeout = settings.FEED_CACHE_TIMEOUT
+    if next_pub_date is not None:
+        timeout = min(timeout, int((next_pub_date - now).total_seconds()) + 1)
+    return timeout
+
+
+class CachedFeed(Feed):
+    """Лента с кэшем готового документа и условными запросами."""
+
+    def __call__(self, request, *args, **kwargs):
+        key = f'{FEED_CACHE_PREFIX}:{feed_version()}:{request.path}'
+        cached = cache.get(key)
+        if cached is None:
+            response = super().__call__(request, *args, **kwargs)
+            cached = (
+                response.content,
+                response['Content-Type'],
+                quote_etag(hashlib.md5(response.content).hexdigest()),
+                int(time.time()),
+            )
+            cache.set(key, cached, cache_timeout())
+        content, content_type, etag, last_modified = cached
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(FEED_DESCRIPTION_WORDS)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.username if item.author else None
+
+    def item_categories(self, item):
+        return (item.category.title,) if item.category else ()
+
+    def posts(self):
+        return Post.objects.published().select_related(
+            'author', 'category'
+        ).order_by('-pub_date')
+
+
+class LatestPostsFeed(CachedFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    def link(self):
+        return reverse('blog:index')
+
+    def items(self):
+        return self.posts()[:FEED_ITEMS]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryFeed(CachedFeed):
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=[category.slug])
+
+    def items(self, category):
+        return self.posts().filter(category=category)[:FEED_ITEMS]
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, category):
+        return category.description
+
+
+class AuthorFeed(CachedFeed):
+    """Лента общая для всех, поэтому только опубликованные посты."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Блогикум: @{author.username}'
+
+    def description(self, author):
+        return f'Публикации пользователя @{author.username}'
+
+    def link(self, author):
+        return reverse('blog:profile', args=[author.username])
+
+    def items(self, author):
+        return self.posts().filter(author=author)[:FEED_ITEMS]
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
@@ -1,19 +1,105 @@
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
 from blog.models import Comment, Post, User
+from blog.uploads import (StrippedImageFile, check_structure, inspect_image,
+                          make_placeholder)
 
 
-class PostForm(forms.ModelForm):
+class StreamingImageField(forms.ImageField):
+    """
+    Поле изображения без полного декодирования.
+    Проверяем размер файла и разрешение по заголовку, структуру —
+    потоковым проходом по файлу, а метаданные вырезаются так же
+    потоково при сохранении. Принимаются JPEG, PNG и GIF.
+    """
+
+    default_error_messages = {
+        'file_too_large': 'Размер файла не должен превышать %(limit)s.',
+        'too_many_pixels': (
+            'Разрешение изображения не должно превышать %(limit)s Мп.'
+        ),
+    }
+
+    def to_python(self, data):
+        file = forms.FileField.to_python(self, data)
+        if file is None:
+            return None
+        max_bytes = settings.POST_IMAGE_MAX_BYTES
+        if file.size > max_bytes:
+            raise ValidationError(
+                self.error_messages['file_too_large'],
+                code='file_too_large',
+                params={'limit': filesizeformat(max_bytes)},
+            )
+        try:
+            info = inspect_image(file)
+        except Image.DecompressionBombError:
+            info = None
+        except Exception as exc:
+            raise ValidationError(
+                self.error_messages['invalid_image'],
+                code='invalid_image',
+            ) from exc
+        if (info is None or info.width * info.height
+                > settings.POST_IMAGE_MAX_PIXELS):
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'limit': settings.POST_IMAGE_MAX_PIXELS // 10 ** 6},
+            )
+        try:
+            check_structure(file, info.format)
+        except ValueError as exc:
+            raise ValidationError(
+                self.error_messages['invalid_image'],
+                code='invalid_image',
+            ) from exc
+        return StrippedImageFile(file, info)
+
+
+class PostImageFormMixin:
+    """
+    Заглушка изображения поста: считается для нового файла
+    и сбрасывается, если изображение удалили.
+    """
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if isinstance(image, StrippedImageFile):
+            self.instance.image_placeholder = make_placeholder(
+                image.file, image.info,
+                settings.POST_IMAGE_PLACEHOLDER_MAX_PIXELS,
+            )
+        elif not image:
+            self.instance.image_placeholder = ''
+        return image
+
+
+class PostForm(PostImageFormMixin, forms.ModelForm):
 
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': StreamingImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(format='%Y-%m-%dT%H:%M',
                                             attrs={'type': 'datetime-local'})
         }
 
 
+class PostAdminForm(PostImageFormMixin, forms.ModelForm):
+    """Форма поста в админке: та же проверка изображения, что на сайте."""
+
+    class Meta:
+        model = Post
+        fields = '__all__'
+        field_classes = {'image': StreamingImageField}
+
+
 class CommentForm(forms.ModelForm):
 
     class Meta:
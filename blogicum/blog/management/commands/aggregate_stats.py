@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.stats import aggregate_stats
+
+
+class Command(BaseCommand):
+    help = 'Обновляет дневную статистику публикаций и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=1,
+            help='Сколько последних посчитанных дней пересчитать заново.',
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать всю историю, например после удалений.',
+        )
+
+    def handle(self, *args, **options):
+        total = aggregate_stats(options['days'], options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика пересчитана за {total} дней.'
+        ))
@@ -0,0 +1,143 @@
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from blog.benchmarks import environment, make_image, measure_upload_memory
+from blog.forms import PostForm
+from blog.mixins import PAGE_PAGINATOR
+from blog.uploads import inspect_image, make_placeholder
+
+# Скриншот, фото с телефона среднего и флагманского уровня, зеркалка.
+DEFAULT_MEGAPIXELS = (0.5, 2, 12, 24)
+# Ширина карточки поста: 40rem.
+RENDITION_WIDTH = 640
+RENDITION_QUALITY = 80
+
+
+def render(path):
+    """Превью для ленты; JPEG декодируется в уменьшенном масштабе."""
+    with Image.open(path) as image:
+        image.thumbnail((RENDITION_WIDTH, RENDITION_WIDTH))
+        buffer = BytesIO()
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=RENDITION_QUALITY
+        )
+    return len(buffer.getvalue())
+
+
+def time_validation(path, repeat):
+    """Медиана полной проверки PostForm с этим файлом, в мс."""
+    timings = []
+    for _ in range(repeat):
+        with open(path, 'rb') as fp:
+            upload = UploadedFile(
+                fp, name=os.path.basename(path),
+                size=os.path.getsize(path),
+            )
+            started = time.perf_counter()
+            PostForm(data={}, files={'image': upload}).is_valid()
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def time_renditions(path, processes, count):
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        started = time.perf_counter()
+        sizes = pool.map(render, [path] * count)
+        elapsed = time.perf_counter() - started
+    return sizes[0], count / elapsed
+
+
+def placeholder_bytes(path):
+    with open(path, 'rb') as fp:
+        return len(make_placeholder(
+            fp, inspect_image(fp),
+            settings.POST_IMAGE_PLACEHOLDER_MAX_PIXELS,
+        ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет стоимость изображений постов: проверку формы, '
+        'генерацию превью, объём ленты и пиковую память. '
+        'Результат пишется в JSON для сравнения между релизами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--megapixels', type=float, nargs='+',
+            default=DEFAULT_MEGAPIXELS,
+            help='Разрешения тестовых изображений в мегапикселях.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз повторять проверку формы.',
+        )
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Число процессов для генерации превью.',
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Путь к JSON-файлу; по умолчанию вывод в консоль.',
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            for megapixels in options['megapixels']:
+                path, width, height = make_image(directory, megapixels)
+                file_bytes = os.path.getsize(path)
+                rendition_bytes, per_second = time_renditions(
+                    path, processes, processes * options['repeat']
+                )
+                result = {
+                    'megapixels': megapixels,
+                    'width': width,
+                    'height': height,
+                    'file_bytes': file_bytes,
+                    'validation_ms': round(
+                        time_validation(path, options['repeat']), 2
+                    ),
+                    'renditions_per_second': round(per_second, 2),
+                    'renditions_per_second_per_core': round(
+                        per_second / processes, 2
+                    ),
+                    'rendition_bytes': rendition_bytes,
+                    'placeholder_bytes': placeholder_bytes(path),
+                    'page_bytes_original': file_bytes * PAGE_PAGINATOR,
+                    'page_bytes_renditions': (
+                        rendition_bytes * PAGE_PAGINATOR
+                    ),
+                    'stream_rss_kib': measure_upload_memory(path, 'stream'),
+                    'decode_rss_kib': measure_upload_memory(path, 'decode'),
+                }
+                results.append(result)
+                self.stderr.write(
+                    '{megapixels} Мп: проверка {validation_ms} мс, '
+                    'превью {renditions_per_second_per_core}/с на ядро, '
+                    'страница {page_bytes_original} → '
+                    '{page_bytes_renditions} байт'.format(**result)
+                )
+        report = json.dumps({
+            'environment': environment(),
+            'processes': processes,
+            'rendition_width': RENDITION_WIDTH,
+            'page_size': PAGE_PAGINATOR,
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fp:
+                fp.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,148 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand
+
+from blog.benchmarks import environment
+from blog.search import FTS_CREATE_SQL, FTS_TABLE
+from blog.stemmer import NOUN, VERB, stem, tokenize
+
+SYLLABLES = [
+    consonant + vowel
+    for consonant in 'бвгдзклмнпрстфхцчшщ'
+    for vowel in 'аеиоуя'
+]
+ENDINGS = [''] + [ending for ending, _ in NOUN + VERB]
+VOCABULARY_SIZE = 50_000
+TITLE_WORDS = 6
+
+
+def make_vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        root = ''.join(rng.choices(SYLLABLES, k=rng.randint(1, 4)))
+        words.add(root + rng.choice(ENDINGS))
+    return sorted(words)
+
+
+class Corpus:
+    """
+    Синтетические посты с частотами слов по закону Ципфа:
+    как и в живом тексте, немногие слова встречаются очень часто.
+    """
+
+    def __init__(self, seed, words_per_post):
+        self.rng = random.Random(seed)
+        self.vocabulary = make_vocabulary(self.rng)
+        self.weights = list(accumulate(
+            1 / rank for rank in range(1, len(self.vocabulary) + 1)
+        ))
+        self.words_per_post = words_per_post
+
+    def words(self, count):
+        return ' '.join(self.rng.choices(
+            self.vocabulary, cum_weights=self.weights, k=count
+        ))
+
+    def batch(self, start, size):
+        return [
+            (pk, self.words(TITLE_WORDS), self.words(self.words_per_post))
+            for pk in range(start, start + size)
+        ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет скорость индексации постов для поиска: '
+        'токенизацию со стеммингом и запись в FTS5 на синтетическом '
+        'корпусе. БД проекта не используется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--words-per-post', type=int, default=80)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default=None,
+            help='Путь к JSON-файлу; по умолчанию вывод в консоль.',
+        )
+
+    def handle(self, *args, **options):
+        corpus = Corpus(options['seed'], options['words_per_post'])
+        batch_size = options['batch_size']
+        stem.cache_clear()
+        tokenize_seconds = insert_seconds = 0.0
+        tokens = 0
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.sqlite3')
+            db = sqlite3.connect(path)
+            db.execute(FTS_CREATE_SQL)
+            insert = (
+                f'INSERT INTO {FTS_TABLE} '
+                '(rowid, title, text, title_terms, text_terms) '
+                'VALUES (?, ?, ?, ?, ?)'
+            )
+            for start in range(1, options['posts'] + 1, batch_size):
+                size = min(batch_size, options['posts'] + 1 - start)
+                posts = corpus.batch(start, size)
+
+                started = time.perf_counter()
+                rows = []
+                for pk, title, text in posts:
+                    title_terms = tokenize(title)
+                    text_terms = tokenize(text)
+                    tokens += len(title_terms) + len(text_terms)
+                    rows.append((
+                        pk, title, text,
+                        ' '.join(title_terms), ' '.join(text_terms),
+                    ))
+                tokenize_seconds += time.perf_counter() - started
+
+                started = time.perf_counter()
+                with db:
+                    db.executemany(insert, rows)
+                insert_seconds += time.perf_counter() - started
+                self.stderr.write(f'{start + size - 1} постов', ending='\r')
+            started = time.perf_counter()
+            db.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+            )
+            db.commit()
+            optimize_seconds = time.perf_counter() - started
+            db.close()
+            index_bytes = os.path.getsize(path)
+        self.stderr.write('')
+
+        posts = options['posts']
+        cache = stem.cache_info()
+        report = {
+            'environment': environment(),
+            'posts': posts,
+            'words_per_post': options['words_per_post'],
+            'tokens': tokens,
+            'tokenize_seconds': round(tokenize_seconds, 2),
+            'tokenize_posts_per_second': round(posts / tokenize_seconds),
+            'tokenize_tokens_per_second': round(tokens / tokenize_seconds),
+            'stem_cache_hit_rate': round(
+                cache.hits / max(cache.hits + cache.misses, 1), 4
+            ),
+            'insert_seconds': round(insert_seconds, 2),
+            'insert_posts_per_second': round(posts / insert_seconds),
+            'optimize_seconds': round(optimize_seconds, 2),
+            'total_posts_per_second': round(
+                posts / (tokenize_seconds + insert_seconds)
+            ),
+            'index_bytes': index_bytes,
+        }
+        report = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fp:
+                fp.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmarks import make_image, measure_upload_memory
+
+DEFAULT_MEGAPIXELS = (1, 6, 12, 24, 50)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пиковую память при проверке и сохранении изображений '
+        'поста в сравнении с полным декодированием.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--megapixels', type=int, nargs='+', default=DEFAULT_MEGAPIXELS,
+            help='Разрешения тестовых изображений в мегапикселях.',
+        )
+        parser.add_argument(
+            '--max-rss-mib', type=float, default=None,
+            help='Ошибка, если прирост памяти при загрузке больше порога.',
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Путь к JSON-файлу с результатами.',
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            for megapixels in options['megapixels']:
+                path, width, height = make_image(directory, megapixels)
+                result = {
+                    'megapixels': megapixels,
+                    'width': width,
+                    'height': height,
+                    'file_bytes': os.path.getsize(path),
+                    'stream_rss_kib': measure_upload_memory(path, 'stream'),
+                    'decode_rss_kib': measure_upload_memory(path, 'decode'),
+                }
+                results.append(result)
+                self.stdout.write(
+                    '{megapixels:>4} Мп {file_bytes:>10} байт: '
+                    'загрузка +{stream_rss_kib} КиБ, '
+                    'декодирование +{decode_rss_kib} КиБ'.format(**result)
+                )
+        if options['output']:
+            with open(options['output'], 'w') as fp:
+                json.dump(results, fp, indent=2)
+        limit = options['max_rss_mib']
+        peak = max(result['stream_rss_kib'] for result in results)
+        if limit is not None and peak > limit * 1024:
+            raise CommandError(
+                f'Прирост памяти при загрузке {peak} КиБ '
+                f'превышает порог {limit} МиБ.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Максимальный прирост памяти при загрузке: {peak} КиБ.'
+        ))
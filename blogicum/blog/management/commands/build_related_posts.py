@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.related import BATCH_SIZE, build_related_posts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает похожие публикации по TF-IDF.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=settings.RELATED_POSTS_LIMIT,
+            help='Сколько похожих публикаций хранить для поста.',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        total = build_related_posts(options['limit'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожие публикации пересчитаны для {total} постов.'
+        ))
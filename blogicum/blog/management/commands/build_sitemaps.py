@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from blog.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Строит карту сайта в SITEMAP_ROOT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default=settings.SITEMAP_BASE_URL,
+            help='Адрес сайта для абсолютных ссылок.',
+        )
+
+    def handle(self, *args, **options):
+        total = build_sitemaps(
+            settings.SITEMAP_ROOT,
+            options['base_url'],
+            lambda name: reverse('blog:sitemap_shard', args=[name]),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Карта сайта построена: {total} адресов.'
+        ))
@@ -0,0 +1,110 @@
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from blog.models import Post
+
+CHUNK_SIZE = 2000
+DEFAULT_MIN_AGE = 60 * 60
+
+
+def scan_files(directory):
+    """Рекурсивный обход через os.scandir без списка всех файлов."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет или переносит в карантин файлы из MEDIA_ROOT, '
+        'на которые не ссылается ни один пост.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, какие файлы будут обработаны.',
+        )
+        parser.add_argument(
+            '--quarantine', default=None,
+            help='Каталог, куда переносить файлы вместо удаления.',
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=DEFAULT_MIN_AGE,
+            help=(
+                'Не трогать файлы моложе указанного числа секунд: '
+                'их пост мог ещё не сохраниться.'
+            ),
+        )
+        parser.add_argument(
+            '--directory', default=Post.image.field.upload_to,
+            help='Подкаталог MEDIA_ROOT для обхода.',
+        )
+
+    def handle(self, *args, **options):
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        directory = os.path.join(media_root, options['directory'])
+        if not os.path.isdir(directory):
+            raise CommandError(f'Каталог {directory} не найден.')
+        quarantine = options['quarantine']
+        if quarantine:
+            quarantine = os.path.abspath(quarantine)
+
+        started = time.monotonic()
+        referenced = set(
+            Post.objects.exclude(image='')
+            .values_list('image', flat=True)
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        loaded = time.monotonic()
+        self.stdout.write(
+            f'Ссылок на файлы в БД: {len(referenced)} '
+            f'за {loaded - started:.2f} с.'
+        )
+
+        threshold = time.time() - options['min_age']
+        scanned = orphans = orphan_bytes = 0
+        for entry in scan_files(directory):
+            if quarantine and entry.path.startswith(quarantine + os.sep):
+                continue
+            scanned += 1
+            name = os.path.relpath(entry.path, media_root).replace(
+                os.sep, '/'
+            )
+            if name in referenced:
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > threshold:
+                continue
+            orphans += 1
+            orphan_bytes += stat.st_size
+            if options['dry_run']:
+                self.stdout.write(name)
+            elif quarantine:
+                target = os.path.join(quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(entry.path, target)
+            else:
+                os.remove(entry.path)
+
+        elapsed = max(time.monotonic() - loaded, 1e-9)
+        action = (
+            'Найдено' if options['dry_run']
+            else 'Перенесено' if quarantine else 'Удалено'
+        )
+        self.stdout.write(
+            f'Просмотрено файлов: {scanned} за {elapsed:.2f} с '
+            f'({scanned / elapsed:.0f} файлов/с).'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} неиспользуемых файлов: {orphans} '
+            f'({filesizeformat(orphan_bytes)}).'
+        ))
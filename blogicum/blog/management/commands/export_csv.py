@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.csv_export import CHUNK_SIZE, csv_lines
+from blog.models import Comment, Post
+
+MODELS = {
+    'posts': Post,
+    'comments': Comment,
+}
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты или комментарии в CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=MODELS)
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; без него — stdout.'
+        )
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument(
+            '--published', choices=('yes', 'no'),
+            help='Только опубликованные или только скрытые.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = MODELS[options['model']].objects.order_by('id')
+        if options['author']:
+            queryset = queryset.filter(author__username=options['author'])
+        if options['published']:
+            queryset = queryset.filter(
+                is_published=options['published'] == 'yes'
+            )
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        lines = csv_lines(queryset, options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(
+                options['output'], 'w', encoding='utf-8', newline=''
+        ) as file:
+            file.writelines(lines)
@@ -0,0 +1,143 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+SENDFILE_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',
+    'x-sendfile': 'X-Sendfile',
+}
+
+
+class RangeFile:
+    """
+    Файл, ограниченный диапазоном байт.
+    fileno() отдаёт исходный дескриптор, а позиция уже стоит
+    на начале диапазона: WSGI-сервер с file_wrapper отправит
+    ровно Content-Length байт через sendfile, остальные
+    читают диапазон обычным read().
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном.
+    Возвращает (start, length), None — если заголовок игнорируем,
+    и False — если диапазон невыполним.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = min(int(last), size)
+        return (size - length, length) if length else False
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end - start + 1
+
+
+def _if_range_passes(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def serve_file(request, name, public=True):
+    """
+    Отдаёт файл из MEDIA_ROOT.
+    Если настроен фронтенд-сервер, только передаёт ему путь
+    (в процентной кодировке: заголовки с не-ASCII символами Django
+    кодирует по RFC 2047, и сервер бы их не понял), иначе отдаёт
+    файл сам с поддержкой Range и условных запросов.
+    """
+    fullpath = os.path.join(settings.MEDIA_ROOT, name)
+    if not os.path.isfile(fullpath):
+        return None
+    content_type = (
+        mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    )
+    backend = settings.POST_IMAGE_SENDFILE_BACKEND
+    if backend:
+        response = HttpResponse(content_type=content_type)
+        if backend == 'x-accel-redirect':
+            response[SENDFILE_HEADERS[backend]] = quote(
+                settings.POST_IMAGE_ACCEL_PREFIX + name
+            )
+        else:
+            response[SENDFILE_HEADERS[backend]] = quote(fullpath)
+    else:
+        response = file_response(request, fullpath, content_type)
+    response['Cache-Control'] = 'public' if public else 'private'
+    return response
+
+
+def file_response(request, fullpath, content_type):
+    """Отдача файла с диска с ETag, Last-Modified и Range."""
+    stat = os.stat(fullpath)
+    last_modified = int(stat.st_mtime)
+    etag = quote_etag(f'{last_modified:x}-{stat.st_size:x}')
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        return _set_validators(response, etag, last_modified)
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and _if_range_passes(
+            request, etag, last_modified):
+        byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    file = open(fullpath, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, length = byte_range
+        response = FileResponse(
+            RangeFile(file, start, length),
+            content_type=content_type,
+            status=206,
+        )
+        response['Content-Length'] = length
+        response['Content-Range'] = (
+            f'bytes {start}-{start + length - 1}/{stat.st_size}'
+        )
+    response['Accept-Ranges'] = 'bytes'
+    return _set_validators(response, etag, last_modified)
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Уменьшенное превью в формате data URI.', verbose_name='Заглушка изображения'),
+        ),
+    ]
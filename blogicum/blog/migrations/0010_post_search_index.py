@@ -0,0 +1,45 @@
+from django.db import migrations
+
+SQLITE_TABLE = 'blog_post_fts'
+PG_INDEX = 'blog_post_search_idx'
+PG_VECTOR = (
+    "to_tsvector('russian', "
+    "coalesce(blog_post.title, '') || ' ' || coalesce(blog_post.text, ''))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} '
+            'USING fts5(title, text)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SQLITE_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {PG_INDEX} '
+            f'ON blog_post USING GIN ({PG_VECTOR})'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {PG_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_image_placeholder'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
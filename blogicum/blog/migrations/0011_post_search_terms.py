@@ -0,0 +1,46 @@
+from django.db import migrations
+
+SQLITE_TABLE = 'blog_post_fts'
+
+
+def index_terms(apps, schema_editor):
+    """
+    Пересоздаём FTS-таблицу с колонками основ слов. Основы здесь
+    не считаются: миграция не зависит от кода стеммера, колонки
+    заполняет rebuild_index после migrate (см. fill_missing_terms).
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {SQLITE_TABLE} '
+        'USING fts5(title, text, title_terms, text_terms)'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {SQLITE_TABLE} (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+
+
+def drop_terms(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5(title, text)'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {SQLITE_TABLE} (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_terms, drop_terms),
+    ]
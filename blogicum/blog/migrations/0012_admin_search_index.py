@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# Таблица, проиндексированные колонки, индекс-таблица для SQLite.
+INDEXES = (
+    ('blog_post', ('title', 'text'), 'blog_post_trigram'),
+    ('blog_comment', ('text',), 'blog_comment_trigram'),
+)
+
+
+def sqlite_statements(table, columns, index):
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    insert = f'INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});'
+    delete = (
+        f"INSERT INTO {index} ({index}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    return (
+        f"CREATE VIRTUAL TABLE {index} USING fts5({names}, "
+        f"content='{table}', content_rowid='id', tokenize='trigram')",
+        f"INSERT INTO {index} ({index}) VALUES ('rebuild')",
+        f'CREATE TRIGGER {index}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {index}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {index}_au AFTER UPDATE OF {names} ON {table} '
+        f'BEGIN {delete} {insert} END',
+    )
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for table, columns, index in INDEXES:
+            for statement in sqlite_statements(table, columns, index):
+                schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        # icontains в PostgreSQL — UPPER(col::text) LIKE UPPER(%s).
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, columns, index in INDEXES:
+            for column in columns:
+                schema_editor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+                    f'ON {table} USING GIN '
+                    f'(UPPER({column}::text) gin_trgm_ops)'
+                )
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, columns, index in INDEXES:
+        if vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {index}_{suffix}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {index}')
+        elif vendor == 'postgresql':
+            for column in columns:
+                schema_editor.execute(
+                    f'DROP INDEX IF EXISTS {table}_{column}_trgm'
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search_terms'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0014_comment_page_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='День')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Публикации')),
+                ('comments', models.PositiveIntegerField(default=0, verbose_name='Комментарии')),
+            ],
+            options={
+                'verbose_name': 'статистика',
+                'verbose_name_plural': 'Статистика',
+                'ordering': ('day',),
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Публикации')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyAuthorStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Публикации')),
+                ('comments', models.PositiveIntegerField(default=0, verbose_name='Комментарии')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailycategorystats',
+            constraint=models.UniqueConstraint(fields=('day', 'category'), name='unique_daily_category_stats'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyauthorstats',
+            constraint=models.UniqueConstraint(fields=('day', 'author'), name='unique_daily_author_stats'),
+        ),
+    ]
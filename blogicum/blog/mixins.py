@@ -1,10 +1,18 @@
-from django.db.models import Count
+from urllib.parse import urlencode
+
+from django.db.models import Count, Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
 
+from blog.api import (API_ORDERING, CURSOR_FIELDS, decode_cursor,
+                      encode_cursor, make_etag, parse_cursor, parse_fields,
+                      parse_limit, post_values, serialize, stream_page)
 from blog.models import Comment, Post
 
 PAGE_PAGINATOR = 10
+COMMENTS_PAGINATOR = 50
 
 
 class CustomListMixin:
@@ -49,3 +57,70 @@ class CommentChangeMixin:
 
     def get_success_url(self):
         return reverse('blog:post_detail', args=[self.kwargs['post_id']])
+
+
+class ApiListMixin:
+    """
+    JSON-версия списка постов. Видимость берётся из get_queryset
+    HTML-страницы, вместо номеров страниц — курсор по (pub_date, id).
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = parse_fields(request.GET.get('fields'))
+            limit = parse_limit(request.GET.get('limit'), PAGE_PAGINATOR)
+            queryset = self.get_queryset().order_by(*API_ORDERING)
+            if request.GET.get('cursor'):
+                queryset = queryset.filter(
+                    decode_cursor(request.GET['cursor'])
+                )
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено.'}, status=404)
+        rows = list(post_values(queryset, fields)[:limit + 1])
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            params = request.GET.copy()
+            params['cursor'] = encode_cursor(*rows[-1][-len(CURSOR_FIELDS):])
+            next_url = f'{request.path}?{params.urlencode()}'
+        items = [serialize(fields, row) for row in rows]
+        etag = make_etag(items)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = StreamingHttpResponse(
+                stream_page(items, next_url),
+                content_type='application/json',
+            )
+        response['ETag'] = etag
+        return response
+
+
+class CommentPageMixin:
+    """
+    Комментарии поста порциями по COMMENTS_PAGINATOR, от старых
+    к новым. Следующая порция начинается после (created_at, id)
+    последнего комментария, номера страниц не используются.
+    """
+
+    def get_comment_page(self, post, cursor=None):
+        comments = post.comments.select_related('author').order_by(
+            'created_at', 'id'
+        )
+        if cursor:
+            created_at, pk = parse_cursor(cursor)
+            comments = comments.filter(
+                Q(created_at__gt=created_at)
+                | Q(created_at=created_at, id__gt=pk)
+            )
+        comments = list(comments[:COMMENTS_PAGINATOR + 1])
+        next_url = None
+        if len(comments) > COMMENTS_PAGINATOR:
+            comments = comments[:COMMENTS_PAGINATOR]
+            last = comments[-1]
+            next_url = '{}?{}'.format(
+                reverse('blog:comment_page', args=[post.pk]),
+                urlencode({'cursor': encode_cursor(last.created_at, last.pk)}),
+            )
+        return comments, next_url
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 from core.models import PublishedModel
 
@@ -45,6 +46,27 @@ class Category(PublishedModel):
         return self.title[:SYMBOL_CONSTRAINT]
 
 
+class PostQuerySet(models.QuerySet):
+
+    @staticmethod
+    def published_filter():
+        """Условие видимости поста для всех посетителей."""
+        return models.Q(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        )
+
+    def published(self):
+        return self.filter(self.published_filter())
+
+    def visible_to(self, user):
+        """Опубликованные посты и все посты самого пользователя."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(self.published_filter() | models.Q(author=user))
+
+
 class Post(PublishedModel):
     title = models.CharField(
         max_length=256,
@@ -82,7 +104,16 @@ class Post(PublishedModel):
         'Изображение',
         upload_to='post_images',
         blank=True,
+        db_index=True,
     )
+    image_placeholder = models.TextField(
+        'Заглушка изображения',
+        blank=True,
+        editable=False,
+        help_text='Уменьшенное превью в формате data URI.',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
@@ -106,11 +137,114 @@ class Comment(PublishedModel):
     )
 
     class Meta:
-        ordering = ('created_at',)
+        ordering = ('created_at', 'id')
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        # Ключ постраничного вывода комментариев под постом.
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return (f'Пост {self.pk}, комментарий от пользователя {self.author}, '
                 f'текст: {self.text[:LIMIT_FOR_COMMENT_TITLE]}')
+
+
+class RelatedPost(models.Model):
+    """
+    Похожие публикации, заранее посчитанные командой
+    build_related_posts. Для поста хранится top-k соседей.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_links',
+        verbose_name='Публикация',
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_backlinks',
+        verbose_name='Похожая публикация',
+    )
+    rank = models.PositiveSmallIntegerField('Позиция')
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        verbose_name = 'похожая публикация'
+        verbose_name_plural = 'Похожие публикации'
+        ordering = ('post', 'rank')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'rank'), name='unique_related_post_rank'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.post_id} → {self.related_id}'
+
+
+class DailyStats(models.Model):
+    """
+    Новые публикации и комментарии за день по дате добавления.
+    Таблицу заполняет команда aggregate_stats.
+    """
+
+    day = models.DateField('День', unique=True)
+    posts = models.PositiveIntegerField('Публикации', default=0)
+    comments = models.PositiveIntegerField('Комментарии', default=0)
+
+    class Meta:
+        verbose_name = 'статистика'
+        verbose_name_plural = 'Статистика'
+        ordering = ('day',)
+
+    def __str__(self):
+        return str(self.day)
+
+
+class DailyAuthorStats(models.Model):
+    day = models.DateField('День')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Автор',
+    )
+    posts = models.PositiveIntegerField('Публикации', default=0)
+    comments = models.PositiveIntegerField('Комментарии', default=0)
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('day', 'author'), name='unique_daily_author_stats'
+            ),
+        )
+
+
+class DailyCategoryStats(models.Model):
+    day = models.DateField('День')
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Категория',
+    )
+    posts = models.PositiveIntegerField('Публикации', default=0)
+
+    class Meta:
+        verbose_name = 'статистика категории'
+        verbose_name_plural = 'Статистика категорий'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('day', 'category'),
+                name='unique_daily_category_stats',
+            ),
+        )
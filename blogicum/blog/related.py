@@ -0,0 +1,173 @@
+"""
+Похожие публикации по TF-IDF.
+Векторы хранятся разреженно: номера термов в array('l'), веса —
+в array('d'). Соседи ищутся через инвертированный индекс порциями
+постов: каждый список постов терма проходится один раз на порцию.
+Длина списков ограничена, поэтому работа растёт линейно с числом
+постов. Результат записывается в таблицу RelatedPost.
+"""
+import heapq
+import math
+from array import array
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from blog.models import Post, RelatedPost
+from blog.stemmer import tokenize
+
+BATCH_SIZE = 1000
+# Сколько самых весомых термов оставлять в векторе поста.
+MAX_TERMS = 64
+# Термы, которые встречаются в большей доле постов, не различают
+# публикации и только удлиняют списки в индексе.
+MAX_DF_RATIO = 0.05
+# Сколько постов с наибольшим весом терма оставлять в его списке.
+MAX_POSTINGS = 1000
+# Слова заголовка весят больше слов текста.
+TITLE_WEIGHT = 2
+
+
+def _document_terms(title, text):
+    counts = Counter(tokenize(text))
+    for term in tokenize(title):
+        counts[term] += TITLE_WEIGHT
+    return counts
+
+
+class TfidfIndex:
+    """Нормированные TF-IDF векторы постов и инвертированный индекс."""
+
+    def __init__(self):
+        self.post_ids = array('q')
+        self.vectors = []
+        self.postings = {}
+
+    def build(self, rows):
+        """rows — итератор (pk, title, text)."""
+        vocabulary = {}
+        document_frequency = array('l')
+        documents = []
+        for pk, title, text in rows:
+            counts = _document_terms(title, text)
+            term_ids = array('l')
+            frequencies = array('l')
+            for term, count in counts.items():
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                if term_id == len(document_frequency):
+                    document_frequency.append(0)
+                document_frequency[term_id] += 1
+                term_ids.append(term_id)
+                frequencies.append(count)
+            self.post_ids.append(pk)
+            documents.append((term_ids, frequencies))
+        total = len(documents)
+        max_df = max(2, int(total * MAX_DF_RATIO))
+        idf = array('d', (
+            math.log((1 + total) / (1 + df)) + 1
+            if 1 < df <= max_df else 0.0
+            for df in document_frequency
+        ))
+        postings = defaultdict(lambda: (array('l'), array('d')))
+        for number, (term_ids, frequencies) in enumerate(documents):
+            vector = self._vector(term_ids, frequencies, idf)
+            self.vectors.append(vector)
+            for term_id, weight in zip(*vector):
+                documents_list, weights = postings[term_id]
+                documents_list.append(number)
+                weights.append(weight)
+        self.postings = {
+            term_id: self._prune(documents_list, weights)
+            for term_id, (documents_list, weights) in postings.items()
+        }
+        return self
+
+    @staticmethod
+    def _prune(documents_list, weights):
+        """Оставляет MAX_POSTINGS постов с наибольшим весом терма."""
+        if len(documents_list) <= MAX_POSTINGS:
+            return documents_list, weights
+        kept = sorted(heapq.nlargest(
+            MAX_POSTINGS, range(len(weights)), key=weights.__getitem__
+        ))
+        return (
+            array('l', (documents_list[number] for number in kept)),
+            array('d', (weights[number] for number in kept)),
+        )
+
+    @staticmethod
+    def _vector(term_ids, frequencies, idf):
+        weighted = heapq.nlargest(MAX_TERMS, (
+            ((1 + math.log(count)) * idf[term_id], term_id)
+            for term_id, count in zip(term_ids, frequencies)
+            if idf[term_id]
+        ))
+        weighted.sort(key=lambda item: item[1])
+        norm = math.sqrt(sum(weight * weight for weight, _ in weighted))
+        return (
+            array('l', (term_id for _, term_id in weighted)),
+            array('d', (weight / norm for weight, _ in weighted)),
+        )
+
+    def neighbours(self, start, stop, limit):
+        """
+        {номер поста: [(сходство, номер соседа)]} для постов из
+        [start, stop). Запросы порции сгруппированы по термам,
+        так что список постов терма читается один раз.
+        """
+        queries = defaultdict(list)
+        for number in range(start, stop):
+            for term_id, weight in zip(*self.vectors[number]):
+                queries[term_id].append((number, weight))
+        scores = {number: defaultdict(float) for number in range(start, stop)}
+        for term_id, batch in queries.items():
+            documents_list, weights = self.postings[term_id]
+            for number, weight in batch:
+                post_scores = scores[number]
+                for other, other_weight in zip(documents_list, weights):
+                    post_scores[other] += weight * other_weight
+        result = {}
+        for number, post_scores in scores.items():
+            post_scores.pop(number, None)
+            result[number] = heapq.nlargest(limit, (
+                (score, other) for other, score in post_scores.items()
+            ))
+        return result
+
+    def related_rows(self, start, stop, limit):
+        """Строки RelatedPost для постов с номерами из [start, stop)."""
+        for number, neighbours in self.neighbours(start, stop, limit).items():
+            post_id = self.post_ids[number]
+            for rank, (score, other) in enumerate(neighbours, start=1):
+                yield RelatedPost(
+                    post_id=post_id,
+                    related_id=self.post_ids[other],
+                    rank=rank,
+                    score=score,
+                )
+
+
+def build_related_posts(limit, batch_size=BATCH_SIZE):
+    """
+    Пересчитывает похожие публикации для всех опубликованных постов.
+    Видимость соседей проверяется при чтении, поэтому отложенные
+    посты и посты скрытых категорий тоже попадают в индекс.
+    Таблица заменяется в одной транзакции.
+    Возвращает число проиндексированных постов.
+    """
+    index = TfidfIndex().build(
+        Post.objects.filter(is_published=True)
+        .values_list('id', 'title', 'text')
+        .iterator(chunk_size=batch_size)
+    )
+    total = len(index.post_ids)
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        for start in range(0, total, batch_size):
+            RelatedPost.objects.bulk_create(
+                index.related_rows(
+                    start, min(start + batch_size, total), limit
+                ),
+                batch_size=batch_size,
+            )
+    return total
@@ -0,0 +1,283 @@
+"""
+Полнотекстовый поиск по постам.
+Для SQLite используется виртуальная таблица FTS5, для PostgreSQL —
+tsvector с GIN-индексом. Бэкенд выбирается по типу подключения.
+"""
+import operator
+import re
+from functools import reduce
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog.models import Post
+from blog.stemmer import tokenize
+
+FTS_TABLE = 'blog_post_fts'
+# Исходные title и text нужны для сниппетов, поиск идёт по основам.
+FTS_CREATE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+    'USING fts5(title, text, title_terms, text_terms)'
+)
+FTS_INSERT_SQL = (
+    f'INSERT INTO {FTS_TABLE} (rowid, title, text, title_terms, text_terms) '
+    'VALUES (%s, %s, %s, %s, %s)'
+)
+# Веса bm25 по колонкам: совпадение в заголовке важнее.
+FTS_RANK = f'bm25({FTS_TABLE}, 0, 0, 2, 1)'
+PG_CONFIG = 'russian'
+PG_VECTOR = (
+    "to_tsvector('russian', "
+    "coalesce(blog_post.title, '') || ' ' || coalesce(blog_post.text, ''))"
+)
+WORD_RE = re.compile(r'\w+')
+BATCH_SIZE = 1000
+# Триграммные индексы для поиска подстрок в админке.
+TRIGRAM_TABLES = {
+    'blog_post': 'blog_post_trigram',
+    'blog_comment': 'blog_comment_trigram',
+}
+TRIGRAM_MIN_LENGTH = 3
+# Границы совпадений в сниппетах: управляющие символы не встречаются
+# в тексте постов и переживают экранирование HTML.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_TOKENS = 16
+FTS_SNIPPET = (
+    f"snippet({FTS_TABLE}, 1, char(2), char(3), '…', {SNIPPET_TOKENS})"
+)
+FTS_HIGHLIGHT = f'highlight({FTS_TABLE}, 0, char(2), char(3))'
+PG_HEADLINE_OPTIONS = (
+    "'StartSel=' || chr(2) || ', StopSel=' || chr(3) || "
+    f"', MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}'"
+)
+
+
+def tokenize_query(query):
+    """Слова запроса без операторов FTS, которые мог ввести пользователь."""
+    return WORD_RE.findall(query.lower())
+
+
+def highlight(fragment):
+    """HTML сниппета: текст экранируется, совпадения оборачиваются в mark."""
+    return mark_safe(
+        escape(fragment)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+def icontains_filter(search_fields, bit):
+    """Условие стандартного поиска админки для одного слова."""
+    return reduce(operator.or_, (
+        Q(**{f'{field}__icontains': bit}) for field in search_fields
+    ))
+
+
+class SQLiteSearchBackend:
+    """Поиск через FTS5; индекс обновляется сигналами модели Post."""
+
+    def match_expression(self, query):
+        """
+        Основы слов запроса, каждая в кавычках: операторы FTS5 не нужны.
+        Ветка OR ничего не добавляет к результату, но даёт FTS5
+        совпадения по префиксам основ в исходных title и text —
+        по ним snippet() и highlight() расставляют подсветку.
+        """
+        stems = tokenize(query)
+        if not stems:
+            return ''
+        terms = ' '.join(f'"{term}"' for term in stems)
+        prefixes = ' OR '.join(f'"{term}" *' for term in stems)
+        match = f'{{title_terms text_terms}} : ({terms})'
+        return f'{match} AND ({match} OR {{title text}} : ({prefixes}))'
+
+    def search(self, queryset, query):
+        """
+        Фильтрует queryset по запросу и сортирует по релевантности.
+        bm25() возвращает меньшие значения для лучших совпадений.
+        Сниппет и подсвеченный заголовок строит FTS5.
+        """
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset.none()
+        return queryset.extra(
+            select={
+                'search_rank': FTS_RANK,
+                'search_snippet': FTS_SNIPPET,
+                'search_title': FTS_HIGHLIGHT,
+            },
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = blog_post.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[expression],
+        ).order_by('search_rank', '-pub_date')
+
+    def substring_search(self, queryset, search_fields, bits):
+        """
+        То же, что icontains по search_fields, но через FTS5 с
+        токенизатором trigram. Слова короче трёх символов
+        в триграммы не попадают, для них остаётся LIKE.
+        """
+        table = TRIGRAM_TABLES[queryset.model._meta.db_table]
+        columns = ' '.join(search_fields)
+        for bit in bits:
+            if len(bit) < TRIGRAM_MIN_LENGTH:
+                queryset = queryset.filter(
+                    icontains_filter(search_fields, bit)
+                )
+                continue
+            phrase = '"{}"'.format(bit.replace('"', '""'))
+            queryset = queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+                [f'{{{columns}}} : {phrase}'],
+            ))
+        return queryset
+
+    def index_rows(self, posts):
+        return [
+            (
+                post.id,
+                post.title,
+                post.text,
+                ' '.join(tokenize(post.title)),
+                ' '.join(tokenize(post.text)),
+            )
+            for post in posts
+        ]
+
+    def update(self, posts):
+        rows = self.index_rows(posts)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(row[0],) for row in rows],
+            )
+            cursor.executemany(FTS_INSERT_SQL, rows)
+
+    def delete(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(post_id,) for post_id in post_ids],
+            )
+
+    def rebuild(self, posts):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        batch = []
+        for post in posts:
+            batch.append(post)
+            if len(batch) == BATCH_SIZE:
+                self.update(batch)
+                batch = []
+        self.update(batch)
+
+
+class PostgreSQLSearchBackend:
+    """
+    Поиск через tsvector. Вектор считается тем же выражением,
+    что и GIN-индекс из миграции, поэтому синхронизировать
+    ничего не нужно.
+    """
+
+    def search(self, queryset, query):
+        if not tokenize_query(query):
+            return queryset.none()
+        tsquery = f"plainto_tsquery('{PG_CONFIG}', %s)"
+        return queryset.extra(
+            select={
+                'search_rank': f'-ts_rank({PG_VECTOR}, {tsquery})',
+                'search_snippet': (
+                    f"ts_headline('{PG_CONFIG}', blog_post.text, {tsquery}, "
+                    f'{PG_HEADLINE_OPTIONS})'
+                ),
+                'search_title': (
+                    f"ts_headline('{PG_CONFIG}', blog_post.title, {tsquery}, "
+                    "'StartSel=' || chr(2) || ', StopSel=' || chr(3) || "
+                    "', HighlightAll=true')"
+                ),
+            },
+            select_params=[query, query, query],
+            where=[f'{PG_VECTOR} @@ {tsquery}'],
+            params=[query],
+        ).order_by('search_rank', '-pub_date')
+
+    def substring_search(self, queryset, search_fields, bits):
+        """Обычный icontains: его обслуживают GIN-индексы pg_trgm."""
+        for bit in bits:
+            queryset = queryset.filter(icontains_filter(search_fields, bit))
+        return queryset
+
+    def update(self, posts):
+        pass
+
+    def delete(self, post_ids):
+        pass
+
+    def rebuild(self, posts):
+        pass
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend():
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'Поиск не поддерживается для БД {connection.vendor}.'
+        )
+
+
+def search_posts(queryset, query):
+    return get_search_backend().search(queryset, query)
+
+
+def substring_search(queryset, search_fields, bits):
+    return get_search_backend().substring_search(
+        queryset, search_fields, bits
+    )
+
+
+def rebuild_index():
+    """Полная переиндексация; посты читаются порциями."""
+    backend = get_search_backend()
+    backend.rebuild(
+        Post.objects.only('id', 'title', 'text').iterator(
+            chunk_size=BATCH_SIZE
+        )
+    )
+
+
+def fill_missing_terms():
+    """
+    Переиндексирует посты, если в FTS-таблице есть строки без основ
+    слов: миграция 0011 переносит только исходные title и text.
+    Возвращает True, если индекс перестроен.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT 1 FROM {FTS_TABLE} '
+                'WHERE title_terms IS NULL LIMIT 1'
+            )
+            missing = cursor.fetchone() is not None
+    except DatabaseError:
+        # Миграции применены не до конца: колонок основ ещё нет.
+        return False
+    if missing:
+        rebuild_index()
+    return missing
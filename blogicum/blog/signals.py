@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from blog import autocomplete
+from blog.counters import invalidate_comment_count, invalidate_comment_counts
+from blog.feeds import invalidate_feeds
+from blog.models import Category, Comment, Post
+from blog.search import fill_missing_terms, get_search_backend
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """Обновляем поисковый индекс при каждом сохранении поста."""
+    get_search_backend().update([instance])
+    autocomplete.index.update_post(instance)
+    invalidate_feeds()
+    invalidate_comment_count(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().delete([instance.pk])
+    autocomplete.index.remove(autocomplete.POST, instance.pk)
+    invalidate_feeds()
+    invalidate_comment_count(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def index_category(sender, instance, **kwargs):
+    autocomplete.index.update_category(instance)
+    invalidate_feeds()
+    invalidate_comment_counts()
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category(sender, instance, **kwargs):
+    autocomplete.index.remove(autocomplete.CATEGORY, instance.pk)
+    invalidate_feeds()
+    invalidate_comment_counts()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def count_comments(sender, instance, **kwargs):
+    invalidate_comment_count(instance.post_id)
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, **kwargs):
+    """
+    Имя пользователя выводится в лентах, поэтому сбрасываем и их —
+    кроме сохранений без username, как обновление last_login при входе.
+    """
+    autocomplete.index.update_user(instance)
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'username' in update_fields:
+        invalidate_feeds()
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    autocomplete.index.remove(autocomplete.USER, instance.pk)
+    invalidate_feeds()
+
+
+@receiver(post_migrate)
+def fill_search_terms(sender, **kwargs):
+    """Основы слов после миграции 0011 считает код стеммера, а не она."""
+    if sender.name == 'blog':
+        fill_missing_terms()
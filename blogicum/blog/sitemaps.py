@@ -0,0 +1,139 @@
+"""
+Карта сайта: индекс и файлы по SHARD_SIZE адресов.
+Файлы строит команда build_sitemaps, строки из БД читаются
+итератором и сразу пишутся на диск.
+"""
+import os
+from xml.sax.saxutils import escape
+
+from django.db.models import Max, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Post, User
+
+SHARD_SIZE = 50_000
+CHUNK_SIZE = 2000
+INDEX_NAME = 'sitemap.xml'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _lastmod(value):
+    return value.isoformat(timespec='seconds') if value else None
+
+
+def post_urls():
+    posts = Post.objects.published().order_by('id').values_list(
+        'id', 'pub_date'
+    )
+    for pk, pub_date in posts.iterator(chunk_size=CHUNK_SIZE):
+        yield reverse('blog:post_detail', args=[pk]), pub_date
+
+
+def _latest_post(prefix):
+    """Дата последней видимой публикации через связь prefix."""
+    return Max(f'{prefix}__pub_date', filter=Q(**{
+        f'{prefix}__is_published': True,
+        f'{prefix}__category__is_published': True,
+        f'{prefix}__pub_date__lte': timezone.now(),
+    }))
+
+
+def category_urls():
+    categories = Category.objects.filter(is_published=True).annotate(
+        lastmod=_latest_post('posts')
+    ).order_by('id').values_list('slug', 'lastmod')
+    for slug, lastmod in categories.iterator(chunk_size=CHUNK_SIZE):
+        yield reverse('blog:category_posts', args=[slug]), lastmod
+
+
+def profile_urls():
+    """Только авторы, у которых есть видимые публикации."""
+    authors = User.objects.annotate(
+        lastmod=_latest_post('posts')
+    ).filter(lastmod__isnull=False).order_by('id').values_list(
+        'username', 'lastmod'
+    )
+    for username, lastmod in authors.iterator(chunk_size=CHUNK_SIZE):
+        yield reverse('blog:profile', args=[username]), lastmod
+
+
+SECTIONS = {
+    'posts': post_urls,
+    'categories': category_urls,
+    'profiles': profile_urls,
+}
+
+
+def _entry(tag, location, lastmod):
+    entry = f'<{tag}><loc>{escape(location)}</loc>'
+    if lastmod:
+        entry += f'<lastmod>{_lastmod(lastmod)}</lastmod>'
+    return entry + f'</{tag}>\n'
+
+
+class SitemapFile:
+    """
+    XML-файл карты, который пишется во временный файл
+    и атомарно подменяет path при закрытии.
+    """
+
+    def __init__(self, path, root):
+        self.path = path
+        self.root = root
+        self.lastmod = None
+        self.count = 0
+        self.file = open(f'{path}.tmp', 'w', encoding='utf-8')
+        self.file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.file.write(f'<{root} xmlns="{XMLNS}">\n')
+
+    def add(self, tag, location, lastmod):
+        self.file.write(_entry(tag, location, lastmod))
+        self.count += 1
+        if lastmod and (self.lastmod is None or lastmod > self.lastmod):
+            self.lastmod = lastmod
+
+    def close(self):
+        self.file.write(f'</{self.root}>\n')
+        self.file.close()
+        os.replace(f'{self.path}.tmp', self.path)
+
+
+def _write_section(directory, section, urls, base_url):
+    """Пишет адреса раздела по SHARD_SIZE в файл, возвращает файлы."""
+    shards = []
+    shard = None
+    for location, lastmod in urls:
+        if shard is None or shard.count == SHARD_SIZE:
+            if shard is not None:
+                shard.close()
+            name = f'sitemap-{section}-{len(shards) + 1}.xml'
+            shard = SitemapFile(os.path.join(directory, name), 'urlset')
+            shards.append((name, shard))
+        shard.add('url', base_url + location, lastmod)
+    if shard is not None:
+        shard.close()
+    return shards
+
+
+def build_sitemaps(directory, base_url, shard_url):
+    """
+    Перестраивает карту сайта в directory.
+    shard_url(name) — путь, по которому отдаётся файл.
+    Индекс пишется последним, устаревшие файлы удаляются.
+    Возвращает число адресов.
+    """
+    os.makedirs(directory, exist_ok=True)
+    base_url = base_url.rstrip('/')
+    shards = []
+    for section, urls in SECTIONS.items():
+        shards += _write_section(directory, section, urls(), base_url)
+    index = SitemapFile(os.path.join(directory, INDEX_NAME), 'sitemapindex')
+    for name, shard in shards:
+        index.add('sitemap', base_url + shard_url(name), shard.lastmod)
+    index.close()
+    current = {name for name, _ in shards} | {INDEX_NAME}
+    for name in os.listdir(directory):
+        if name.startswith('sitemap') and name not in current:
+            os.remove(os.path.join(directory, name))
+    return sum(shard.count for _, shard in shards)
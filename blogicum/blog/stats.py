@@ -0,0 +1,157 @@
+"""
+Статистика для админки по дневным сводным таблицам.
+Команда aggregate_stats пересчитывает только последние дни, страница
+статистики читает готовые строки: ряды по дням собираются в array('l')
+и сжимаются до CHART_POINTS точек для графика.
+"""
+from array import array
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from blog.models import (Comment, DailyAuthorStats, DailyCategoryStats,
+                         DailyStats, Post)
+
+TOP_LIMIT = 10
+CHART_POINTS = 365
+CHART_WIDTH = 720
+CHART_HEIGHT = 160
+# Период на странице статистики: параметр → (подпись, дней).
+PERIODS = {
+    '30': ('30 дней', 30),
+    '365': ('год', 365),
+    'all': ('всё время', None),
+}
+DEFAULT_PERIOD = '365'
+
+
+def _per_day(queryset, *fields):
+    """{(день, *fields): число строк} одним запросом с GROUP BY."""
+    rows = queryset.annotate(day=TruncDate('created_at')).order_by().values(
+        'day', *fields
+    ).annotate(count=Count('id')).values_list('day', *fields, 'count')
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def aggregate_stats(days=1, full=False):
+    """
+    Пересчитывает сводные таблицы начиная с последнего дня,
+    который уже был посчитан (он мог быть неполным), и ещё days - 1
+    дней до него. full — пересчитать всю историю.
+    Возвращает число пересчитанных дней.
+    """
+    last_day = DailyStats.objects.aggregate(last=Max('day'))['last']
+    posts, comments = Post.objects.all(), Comment.objects.all()
+    since = None
+    if not full and last_day is not None:
+        since = last_day - timedelta(days=max(days, 1) - 1)
+        start = timezone.make_aware(datetime.combine(since, time.min))
+        posts = posts.filter(created_at__gte=start)
+        comments = comments.filter(created_at__gte=start)
+    author_posts = _per_day(
+        posts.filter(author__isnull=False), 'author_id'
+    )
+    author_comments = _per_day(comments, 'author_id')
+    category_posts = _per_day(
+        posts.filter(category__isnull=False), 'category_id'
+    )
+    day_posts, day_comments = Counter(), Counter()
+    for (day,), count in _per_day(posts).items():
+        day_posts[day] = count
+    for (day, _), count in author_comments.items():
+        day_comments[day] += count
+    stale = {} if since is None else {'day__gte': since}
+    with transaction.atomic():
+        for model in (DailyStats, DailyAuthorStats, DailyCategoryStats):
+            model.objects.filter(**stale).delete()
+        DailyStats.objects.bulk_create(
+            DailyStats(
+                day=day, posts=day_posts[day], comments=day_comments[day]
+            )
+            for day in sorted(day_posts.keys() | day_comments.keys())
+        )
+        DailyAuthorStats.objects.bulk_create(
+            DailyAuthorStats(
+                day=day,
+                author_id=author_id,
+                posts=author_posts.get((day, author_id), 0),
+                comments=author_comments.get((day, author_id), 0),
+            )
+            for day, author_id in author_posts.keys() | author_comments.keys()
+        )
+        DailyCategoryStats.objects.bulk_create(
+            DailyCategoryStats(day=day, category_id=category_id, posts=count)
+            for (day, category_id), count in category_posts.items()
+        )
+    return len(day_posts.keys() | day_comments.keys())
+
+
+def period_range(period):
+    """(первый, последний день) периода или None, если статистики нет."""
+    bounds = DailyStats.objects.aggregate(first=Min('day'), last=Max('day'))
+    if bounds['last'] is None:
+        return None
+    days = PERIODS[period][1]
+    start = bounds['first']
+    if days is not None:
+        start = max(start, bounds['last'] - timedelta(days=days - 1))
+    return start, bounds['last']
+
+
+def daily_series(start, end):
+    """
+    Ряды (публикации, комментарии) за дни из [start, end]:
+    дни без строк в сводной таблице дают ноль.
+    """
+    length = (end - start).days + 1
+    posts = array('l', [0]) * length
+    comments = array('l', [0]) * length
+    rows = DailyStats.objects.filter(day__range=(start, end)).values_list(
+        'day', 'posts', 'comments'
+    )
+    for day, day_posts, day_comments in rows:
+        index = (day - start).days
+        posts[index] = day_posts
+        comments[index] = day_comments
+    return posts, comments
+
+
+def resample(series, points=CHART_POINTS):
+    """Сумма по соседним дням, чтобы в ряду было не больше points точек."""
+    size = -(-len(series) // points) if series else 1
+    return array('l', (
+        sum(series[start:start + size])
+        for start in range(0, len(series), size)
+    ))
+
+
+def chart_points(series, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Координаты для <polyline> SVG-графика."""
+    if not series:
+        return ''
+    top = max(series) or 1
+    step = width / max(len(series) - 1, 1)
+    return ' '.join(
+        f'{number * step:.1f},{height - value * height / top:.1f}'
+        for number, value in enumerate(series)
+    )
+
+
+def top_authors(start, end, limit=TOP_LIMIT):
+    return DailyAuthorStats.objects.filter(
+        day__range=(start, end)
+    ).values('author__username').annotate(
+        total_posts=Sum('posts'), total_comments=Sum('comments')
+    ).order_by('-total_posts', '-total_comments')[:limit]
+
+
+def top_categories(start, end, limit=TOP_LIMIT):
+    return DailyCategoryStats.objects.filter(
+        day__range=(start, end)
+    ).values('category__title').annotate(
+        total_posts=Sum('posts')
+    ).order_by('-total_posts')[:limit]
@@ -0,0 +1,160 @@
+"""
+Стеммер русского языка по алгоритму Snowball
+(https://snowballstem.org/algorithms/russian/stemmer.html)
+и токенизатор для поискового индекса.
+"""
+import re
+from functools import lru_cache
+
+VOWELS = frozenset('аеиоуыэюя')
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile(r'[а-яё]')
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    (),
+    (
+        'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой',
+        'ем', 'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых',
+        'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+    ),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (
+    (
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'ешь', 'нно',
+    ),
+    (
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+        'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+        'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    ),
+)
+NOUN = (
+    (),
+    (
+        'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи',
+        'ии', 'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием',
+        'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию',
+        'ью', 'ю', 'ия', 'ья', 'я',
+    ),
+)
+SUPERLATIVE = ((), ('ейше', 'ейш'))
+DERIVATIONAL = ((), ('ость', 'ост'))
+
+
+def _by_length(groups):
+    """
+    Окончания группы, от длинных к коротким, с флагом
+    «перед окончанием должна стоять а или я».
+    """
+    endings = [(ending, True) for ending in groups[0]]
+    endings += [(ending, False) for ending in groups[1]]
+    return tuple(sorted(endings, key=lambda item: -len(item[0])))
+
+
+PERFECTIVE_GERUND = _by_length(PERFECTIVE_GERUND)
+ADJECTIVE = _by_length(ADJECTIVE)
+PARTICIPLE = _by_length(PARTICIPLE)
+REFLEXIVE = _by_length(REFLEXIVE)
+VERB = _by_length(VERB)
+NOUN = _by_length(NOUN)
+SUPERLATIVE = _by_length(SUPERLATIVE)
+DERIVATIONAL = _by_length(DERIVATIONAL)
+
+
+def _regions(word):
+    """Начала областей RV и R2."""
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _remove(word, endings, start):
+    """
+    Удаляет самое длинное окончание, лежащее целиком после start.
+    Если у него не выполнено условие про а/я, более короткие
+    окончания не проверяются — как в Snowball.
+    Возвращает None, если ничего не удалено.
+    """
+    for ending, after_a in endings:
+        if not word.endswith(ending):
+            continue
+        stem = word[:-len(ending)]
+        if len(stem) < start:
+            continue
+        if after_a and (len(stem) <= start or stem[-1] not in 'ая'):
+            return None
+        return stem
+    return None
+
+
+def _adjectival(word, rv):
+    stem = _remove(word, ADJECTIVE, rv)
+    if stem is None:
+        return None
+    return _remove(stem, PARTICIPLE, rv) or stem
+
+
+@lru_cache(maxsize=200_000)
+def stem(word):
+    """Основа слова в нижнем регистре."""
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    result = _remove(word, PERFECTIVE_GERUND, rv)
+    if result is None:
+        word = _remove(word, REFLEXIVE, rv) or word
+        result = (
+            _adjectival(word, rv)
+            or _remove(word, VERB, rv)
+            or _remove(word, NOUN, rv)
+        )
+    if result is not None:
+        word = result
+
+    if word.endswith('и') and len(word) > rv:
+        word = word[:-1]
+
+    word = _remove(word, DERIVATIONAL, r2) or word
+
+    superlative = _remove(word, SUPERLATIVE, rv)
+    if superlative is not None:
+        word = superlative
+    if word.endswith('нн') and len(word) - 1 > rv:
+        word = word[:-1]
+    elif superlative is None and word.endswith('ь') and len(word) > rv:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """
+    Слова текста в нижнем регистре; русские слова
+    заменяются основами, остальные остаются как есть.
+    """
+    return [
+        stem(word) if CYRILLIC_RE.search(word) else word
+        for word in WORD_RE.findall(text.lower())
+    ]
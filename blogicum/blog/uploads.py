@@ -0,0 +1,294 @@
+from base64 import b64encode
+from collections import namedtuple
+from io import BytesIO
+
+from django.core.files import File
+from PIL import Image, ImageOps
+
+CHUNK_SIZE = 64 * 1024
+PLACEHOLDER_SIZE = 16
+EXIF_ORIENTATION_TAG = 0x0112
+
+JPEG_SOI = b'\xff\xd8'
+# Маркеры без поля длины: TEM, RST0-RST7.
+JPEG_STANDALONE_MARKERS = frozenset((0x01, *range(0xD0, 0xD8)))
+# APP1 (EXIF/XMP), APP13 (IPTC) и комментарии.
+JPEG_METADATA_MARKERS = frozenset((0xE1, 0xED, 0xFE))
+JPEG_APP0 = 0xE0
+JPEG_SOS = 0xDA
+JPEG_EOI = 0xD9
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_METADATA_CHUNKS = frozenset((b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME'))
+PNG_IEND = b'IEND'
+
+GIF_SIGNATURES = frozenset((b'GIF87a', b'GIF89a'))
+GIF_EXTENSION = 0x21
+GIF_IMAGE = 0x2C
+GIF_TRAILER = 0x3B
+GIF_COMMENT = 0xFE
+GIF_APPLICATION = 0xFF
+# Из прикладных расширений оставляем только число повторов анимации:
+# в остальных (например, XMP) могут быть метаданные.
+GIF_LOOP_APPLICATIONS = frozenset((b'NETSCAPE2.0', b'ANIMEXTS1.0'))
+
+ImageInfo = namedtuple(
+    'ImageInfo', ('format', 'width', 'height', 'content_type', 'orientation')
+)
+
+
+def inspect_image(file):
+    """
+    Читает только заголовок изображения, не декодируя пиксели.
+    Pillow при открытии разбирает маркеры до начала данных,
+    поэтому память не зависит от разрешения картинки.
+    """
+    file.seek(0)
+    image = Image.open(file)
+    try:
+        orientation = None
+        if image.format == 'JPEG':
+            orientation = image.getexif().get(EXIF_ORIENTATION_TAG)
+        return ImageInfo(
+            image.format,
+            image.width,
+            image.height,
+            Image.MIME.get(image.format),
+            orientation,
+        )
+    finally:
+        file.seek(0)
+
+
+def make_placeholder(file, info, max_pixels):
+    """
+    Превью ~16px в виде data URI для фона до загрузки картинки.
+    JPEG декодируется в уменьшенном масштабе (draft), остальные
+    форматы — только если разрешение не больше max_pixels.
+    """
+    if info.format != 'JPEG' and info.width * info.height > max_pixels:
+        return ''
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            preview = ImageOps.exif_transpose(image).convert('RGB')
+        buffer = BytesIO()
+        preview.save(buffer, 'PNG', optimize=True)
+    except OSError:
+        # Повреждённые данные после заголовка: файл сохраним без превью.
+        return ''
+    finally:
+        file.seek(0)
+    return 'data:image/png;base64,' + b64encode(buffer.getvalue()).decode()
+
+
+def _read_exact(fp, size):
+    data = fp.read(size)
+    if len(data) != size:
+        raise ValueError('Неожиданный конец файла изображения.')
+    return data
+
+
+def _copy(fp, size, chunk_size):
+    while size > 0:
+        data = _read_exact(fp, min(size, chunk_size))
+        size -= len(data)
+        yield data
+
+
+def _skip(fp, size):
+    fp.seek(size, 1)
+
+
+def _copy_rest(fp, chunk_size):
+    while True:
+        data = fp.read(chunk_size)
+        if not data:
+            return
+        yield data
+
+
+def _orientation_segment(orientation):
+    """APP1-сегмент, в котором от EXIF осталась только ориентация."""
+    payload = b''.join((
+        b'Exif\x00\x00',
+        b'MM\x00\x2a',
+        (8).to_bytes(4, 'big'),
+        (1).to_bytes(2, 'big'),
+        EXIF_ORIENTATION_TAG.to_bytes(2, 'big'),
+        (3).to_bytes(2, 'big'),
+        (1).to_bytes(4, 'big'),
+        orientation.to_bytes(2, 'big'),
+        b'\x00\x00',
+        (0).to_bytes(4, 'big'),
+    ))
+    return b'\xff\xe1' + (len(payload) + 2).to_bytes(2, 'big') + payload
+
+
+def _strip_jpeg(fp, chunk_size, orientation=None):
+    if _read_exact(fp, 2) != JPEG_SOI:
+        raise ValueError('Файл не является JPEG.')
+    yield JPEG_SOI
+    pending = None
+    if orientation and orientation != 1:
+        pending = _orientation_segment(orientation)
+    while True:
+        byte = _read_exact(fp, 1)
+        if byte != b'\xff':
+            raise ValueError('Повреждённая структура JPEG.')
+        code = _read_exact(fp, 1)[0]
+        while code == 0xFF:
+            code = _read_exact(fp, 1)[0]
+        if pending and code != JPEG_APP0:
+            yield pending
+            pending = None
+        if code in JPEG_STANDALONE_MARKERS:
+            yield bytes((0xFF, code))
+            continue
+        if code in (JPEG_SOS, JPEG_EOI):
+            yield bytes((0xFF, code))
+            break
+        length = _read_exact(fp, 2)
+        size = int.from_bytes(length, 'big') - 2
+        if code in JPEG_METADATA_MARKERS:
+            _skip(fp, size)
+            continue
+        yield bytes((0xFF, code)) + length
+        yield from _copy(fp, size, chunk_size)
+    # После SOS идут сжатые данные: метаданных там нет.
+    yield from _copy_rest(fp, chunk_size)
+
+
+def _strip_png(fp, chunk_size):
+    if _read_exact(fp, 8) != PNG_SIGNATURE:
+        raise ValueError('Файл не является PNG.')
+    yield PNG_SIGNATURE
+    while True:
+        header = _read_exact(fp, 8)
+        size = int.from_bytes(header[:4], 'big') + 4
+        chunk_type = header[4:]
+        if chunk_type in PNG_METADATA_CHUNKS:
+            _skip(fp, size)
+            continue
+        yield header
+        yield from _copy(fp, size, chunk_size)
+        if chunk_type == PNG_IEND:
+            return
+
+
+def _gif_color_table(packed):
+    """Размер палитры по байту флагов дескриптора."""
+    return 3 << ((packed & 0x07) + 1) if packed & 0x80 else 0
+
+
+def _gif_sub_blocks(fp):
+    """Подблоки данных GIF вместе с завершающим нулевым."""
+    while True:
+        size = _read_exact(fp, 1)
+        yield size + _read_exact(fp, size[0])
+        if not size[0]:
+            return
+
+
+def _gif_blocks(fp):
+    header = _read_exact(fp, 6)
+    if header not in GIF_SIGNATURES:
+        raise ValueError('Файл не является GIF.')
+    screen = _read_exact(fp, 7)
+    yield header + screen + _read_exact(fp, _gif_color_table(screen[4]))
+    while True:
+        introducer = _read_exact(fp, 1)
+        if introducer[0] == GIF_TRAILER:
+            yield introducer
+            return
+        if introducer[0] == GIF_IMAGE:
+            descriptor = _read_exact(fp, 9)
+            # За палитрой кадра — байт минимального размера кода LZW.
+            yield introducer + descriptor + _read_exact(
+                fp, _gif_color_table(descriptor[8]) + 1
+            )
+            yield from _gif_sub_blocks(fp)
+            continue
+        if introducer[0] != GIF_EXTENSION:
+            raise ValueError('Повреждённая структура GIF.')
+        yield from _gif_extension(fp, introducer)
+
+
+def _gif_extension(fp, introducer):
+    """Расширение GIF или ничего, если в нём метаданные."""
+    label = _read_exact(fp, 1)
+    blocks = _gif_sub_blocks(fp)
+    first = b''
+    if label[0] in (GIF_COMMENT, GIF_APPLICATION):
+        first = next(blocks)
+        if first[1:] not in GIF_LOOP_APPLICATIONS:
+            for _ in blocks:
+                pass
+            return
+    yield introducer + label + first
+    yield from blocks
+
+
+def _strip_gif(fp, chunk_size):
+    # Подблоки GIF не длиннее 255 байт: собираем их в куски.
+    buffer = bytearray()
+    for data in _gif_blocks(fp):
+        buffer += data
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def strip_metadata(fp, image_format, orientation=None,
+                   chunk_size=CHUNK_SIZE):
+    """
+    Генератор кусков файла без EXIF и прочих метаданных.
+    Файл читается один раз, в памяти не больше одного куска.
+    Для форматов, кроме JPEG, PNG и GIF, — ValueError: вырезать
+    из них метаданные мы не умеем.
+    """
+    if image_format == 'JPEG':
+        return _strip_jpeg(fp, chunk_size, orientation)
+    if image_format == 'PNG':
+        return _strip_png(fp, chunk_size)
+    if image_format == 'GIF':
+        return _strip_gif(fp, chunk_size)
+    raise ValueError('Неподдерживаемый формат изображения.')
+
+
+def check_structure(fp, image_format):
+    """
+    Проходит файл тем же разбором, что и при сохранении, отбрасывая
+    результат: обрезанный или повреждённый файл даст ValueError
+    при проверке формы, а не при записи в хранилище.
+    """
+    fp.seek(0)
+    try:
+        for _ in strip_metadata(fp, image_format):
+            pass
+    finally:
+        fp.seek(0)
+
+
+class StrippedImageFile(File):
+    """
+    Загруженный файл, который отдаёт хранилищу куски без метаданных.
+    Хранилище пишет их на диск по мере чтения.
+    """
+
+    def __init__(self, file, info):
+        super().__init__(file, name=file.name)
+        self.info = info
+        self.content_type = info.content_type
+
+    def chunks(self, chunk_size=None):
+        self.file.seek(0)
+        yield from strip_metadata(
+            self.file,
+            self.info.format,
+            self.info.orientation,
+            chunk_size or CHUNK_SIZE,
+        )
@@ -1,6 +1,7 @@
 from django.urls import include, path
 
-from blog import views
+from blog import feeds, views
+from blog.api import API_VERSION
 
 app_name = 'blog'
 
@@ -26,6 +27,11 @@ posts_urls = [
         views.PostDeleteView.as_view(),
         name='delete_post'
     ),
+    path(
+        '<int:post_id>/comments/',
+        views.CommentPageView.as_view(),
+        name='comment_page'
+    ),
     path(
         '<int:post_id>/comment/',
         views.CommentCreateView.as_view(),
@@ -49,11 +55,54 @@ profile_urls = [
         views.ProfileUpdateView.as_view(),
         name='edit_profile'
     ),
+    path(
+        'export/',
+        views.ProfileExportView.as_view(),
+        name='export_profile'
+    ),
     path(
         '<str:username>/',
         views.ProfileView.as_view(),
         name='profile'
     ),
+    path(
+        '<str:username>/rss/',
+        feeds.AuthorFeed(),
+        name='profile_rss'
+    ),
+    path(
+        '<str:username>/atom/',
+        feeds.AuthorAtomFeed(),
+        name='profile_atom'
+    ),
+]
+
+api_urls = [
+    path(
+        'posts/',
+        views.ApiIndexView.as_view(),
+        name='api_index'
+    ),
+    path(
+        'posts/<int:pk>/',
+        views.ApiPostView.as_view(),
+        name='api_post_detail'
+    ),
+    path(
+        'comment-counts/',
+        views.CommentCountView.as_view(),
+        name='api_comment_counts'
+    ),
+    path(
+        'category/<slug:category_slug>/',
+        views.ApiCategoryView.as_view(),
+        name='api_category_posts'
+    ),
+    path(
+        'profile/<str:username>/',
+        views.ApiProfileView.as_view(),
+        name='api_profile'
+    ),
 ]
 
 urlpatterns = [
@@ -62,11 +111,52 @@ urlpatterns = [
         views.IndexHome.as_view(),
         name='index'
     ),
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
+    path(
+        'autocomplete/',
+        views.AutocompleteView.as_view(),
+        name='autocomplete'
+    ),
     path('posts/', include(posts_urls)),
     path('profile/', include(profile_urls)),
+    path(f'api/{API_VERSION}/', include(api_urls)),
+    path(
+        'sitemap.xml',
+        views.SitemapView.as_view(),
+        name='sitemap'
+    ),
+    path(
+        'sitemaps/<str:name>',
+        views.SitemapView.as_view(),
+        name='sitemap_shard'
+    ),
+    path(
+        'rss/',
+        feeds.LatestPostsFeed(),
+        name='rss'
+    ),
+    path(
+        'atom/',
+        feeds.LatestPostsAtomFeed(),
+        name='atom'
+    ),
     path(
         'category/<slug:category_slug>/',
         views.CategoryListView.as_view(),
         name='category_posts'
-    )
+    ),
+    path(
+        'category/<slug:category_slug>/rss/',
+        feeds.CategoryFeed(),
+        name='category_rss'
+    ),
+    path(
+        'category/<slug:category_slug>/atom/',
+        feeds.CategoryAtomFeed(),
+        name='category_atom'
+    ),
 ]
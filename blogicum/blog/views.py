@@ -1,13 +1,29 @@
+import os
+import posixpath
+import re
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.db.models import (BooleanField, Count, ExpressionWrapper, OuterRef,
+                              Subquery)
+from django.db.models.functions import Coalesce
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
-from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  UpdateView, View)
 
+from blog.api import (export_lines, make_etag, parse_export_cursor,
+                      parse_fields, post_values, serialize)
+from blog.autocomplete import index as autocomplete_index
+from blog.counters import comment_counts, parse_ids
 from blog.forms import CommentForm, PostForm, UserForm
-from blog.mixins import CommentChangeMixin, CustomListMixin, PostChangeMixin
-from blog.models import Category, Comment, Post, User
+from blog.media import file_response, serve_file
+from blog.mixins import (ApiListMixin, CommentChangeMixin, CommentPageMixin,
+                         CustomListMixin, PostChangeMixin)
+from blog.models import Category, Comment, Post, PostQuerySet, User
+from blog.search import highlight, search_posts
 
 
 class IndexHome(CustomListMixin, ListView):
@@ -16,11 +32,7 @@ class IndexHome(CustomListMixin, ListView):
     template_name = 'blog/index.html'
 
     def get_queryset(self):
-        return super().get_queryset().filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now()
-        )
+        return super().get_queryset().published()
 
 
 class CategoryListView(CustomListMixin, ListView):
@@ -34,10 +46,7 @@ class CategoryListView(CustomListMixin, ListView):
             slug=self.kwargs['category_slug'],
             is_published=True
         )
-        return super().get_queryset().filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now(),
+        return super().get_queryset().published().filter(
             category__slug=self.kwargs['category_slug']
         )
 
@@ -47,6 +56,51 @@ class CategoryListView(CustomListMixin, ListView):
         return context
 
 
+class PostSearchView(CustomListMixin, ListView):
+    """
+    Полнотекстовый поиск по опубликованным постам.
+    Сниппеты с подсветкой совпадений строит поисковый индекс.
+    Число комментариев считаем подзапросом: функции ранжирования
+    FTS5 нельзя использовать в запросе с GROUP BY.
+    """
+
+    template_name = 'blog/search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        comment_count = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(count=Count('pk'))
+        queryset = Post.objects.select_related(
+            'category', 'location', 'author'
+        ).published().annotate(
+            comment_count=Coalesce(Subquery(comment_count.values('count')), 0)
+        )
+        # Полный текст не нужен: карточке хватает сниппета из индекса.
+        return search_posts(queryset.defer('text'), self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        for post in context['page_obj']:
+            post.highlighted_title = highlight(post.search_title)
+            post.snippet = highlight(post.search_snippet)
+        return context
+
+
+class AutocompleteView(View):
+    """
+    Подсказки по префиксу для строки поиска.
+    Отвечает из индекса в памяти, без запросов к БД.
+    """
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        return JsonResponse({'results': autocomplete_index.search(
+            query, settings.AUTOCOMPLETE_LIMIT
+        )})
+
+
 class ProfileView(CustomListMixin, ListView):
     """Рендеринг профиля пользователя."""
 
@@ -73,6 +127,28 @@ class ProfileView(CustomListMixin, ListView):
         )
 
 
+class ProfileExportView(LoginRequiredMixin, View):
+    """
+    Выгрузка всех постов и комментариев пользователя в NDJSON.
+    Ответ пишется по мере чтения из БД; оборванную выгрузку
+    можно продолжить с ?cursor= последней полученной записи.
+    """
+
+    def get(self, request):
+        try:
+            kind, after = parse_export_cursor(request.GET.get('cursor'))
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        response = StreamingHttpResponse(
+            export_lines(request.user, kind, after),
+            content_type='application/x-ndjson',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{request.user.username}.ndjson"'
+        )
+        return response
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     """Редактирование профиля."""
 
@@ -136,7 +212,7 @@ class PostDeleteView(LoginRequiredMixin, PostChangeMixin, DeleteView):
         )
 
 
-class PostDetailView(DetailView):
+class PostDetailView(CommentPageMixin, DetailView):
     """
     Рендеринг страницы с отдельным постом.
     Сначала проверяем наличие поста в БД по pk без фильтров.
@@ -157,11 +233,7 @@ class PostDetailView(DetailView):
             return get_object_or_404(
                 self.model.objects.select_related(
                     'location', 'category', 'author'
-                ).filter(
-                    pub_date__lte=timezone.now(),
-                    category__is_published=True,
-                    is_published=True
-                ),
+                ).published(),
                 pk=self.kwargs['pk']
             )
         return object
@@ -169,8 +241,14 @@ class PostDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
+        context['comments'], context['next_comments_url'] = (
+            self.get_comment_page(self.object)
+        )
+        context['related_posts'] = (
+            Post.objects.published()
+            .filter(related_backlinks__post=self.object)
+            .order_by('related_backlinks__rank')
+            .only('id', 'title')[:settings.RELATED_POSTS_LIMIT]
         )
         return context
 
@@ -194,6 +272,42 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
                        kwargs={'pk': self.kwargs.get('post_id')})
 
 
+class CommentPageView(CommentPageMixin, View):
+    """
+    Следующая порция комментариев: HTML-фрагмент для вставки
+    в страницу поста или JSON при ?format=json.
+    """
+
+    def get(self, request, post_id):
+        post = get_object_or_404(
+            Post.objects.visible_to(request.user), pk=post_id
+        )
+        try:
+            comments, next_url = self.get_comment_page(
+                post, request.GET.get('cursor')
+            )
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'results': [
+                    {
+                        'id': comment.id,
+                        'author': comment.author.username,
+                        'text': comment.text,
+                        'created_at': comment.created_at,
+                    }
+                    for comment in comments
+                ],
+                'next': next_url,
+            }, json_dumps_params={'ensure_ascii': False})
+        return render(request, 'includes/comment_list.html', {
+            'post': post,
+            'comments': comments,
+            'next_comments_url': next_url,
+        })
+
+
 class CommentUpdateView(LoginRequiredMixin, CommentChangeMixin, UpdateView):
     """Редактирование комментария."""
 
@@ -202,3 +316,106 @@ class CommentUpdateView(LoginRequiredMixin, CommentChangeMixin, UpdateView):
 
 class CommentDeleteView(LoginRequiredMixin, CommentChangeMixin, DeleteView):
     """Удаление комментария."""
+
+
+class PostImageView(View):
+    """
+    Отдача изображений постов.
+    Одним запросом по индексу проверяем, что файл принадлежит посту,
+    видимому пользователю, а саму отдачу передаём фронтенд-серверу
+    или FileResponse.
+    """
+
+    def get(self, request, path):
+        name = posixpath.normpath(path).lstrip('/')
+        if name.startswith('..'):
+            raise Http404
+        is_public = (
+            Post.objects.visible_to(request.user)
+            .filter(image=name)
+            .annotate(is_public=ExpressionWrapper(
+                PostQuerySet.published_filter(),
+                output_field=BooleanField(),
+            ))
+            .values_list('is_public', flat=True)
+            .first()
+        )
+        if is_public is None:
+            raise Http404
+        response = serve_file(request, name, public=is_public)
+        if response is None:
+            raise Http404
+        return response
+
+
+class ApiIndexView(ApiListMixin, IndexHome):
+    """Лента главной страницы в JSON."""
+
+
+class ApiCategoryView(ApiListMixin, CategoryListView):
+    """Публикации категории в JSON."""
+
+
+class ApiProfileView(ApiListMixin, ProfileView):
+    """Публикации пользователя в JSON."""
+
+
+class CommentCountView(View):
+    """
+    Число комментариев для списка постов: ?ids=1,2,3.
+    Значения берутся из кэша, промахи считаются одним запросом.
+    """
+
+    def get(self, request):
+        try:
+            ids = parse_ids(request.GET.get('ids', ''))
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        counts = comment_counts(request.user, ids)
+        return JsonResponse({
+            'counts': {str(pk): count for pk, count in sorted(counts.items())}
+        })
+
+
+class ApiPostView(View):
+    """
+    Отдельный пост в JSON.
+    Видимость та же, что у PostDetailView: автор видит свои посты,
+    остальные — только опубликованные.
+    """
+
+    def get(self, request, pk):
+        try:
+            fields = parse_fields(request.GET.get('fields'))
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        queryset = Post.objects.visible_to(request.user).filter(pk=pk)
+        if 'comment_count' in fields:
+            queryset = queryset.annotate(comment_count=Count('comments'))
+        row = post_values(queryset, fields).first()
+        if row is None:
+            return JsonResponse({'error': 'Не найдено.'}, status=404)
+        item = serialize(fields, row)
+        etag = make_etag([item])
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse(
+                item, json_dumps_params={'ensure_ascii': False}
+            )
+        response['ETag'] = etag
+        return response
+
+
+class SitemapView(View):
+    """
+    Карта сайта, заранее построенная командой build_sitemaps.
+    Файлы отдаются с диска, запросов к БД нет.
+    """
+
+    name_re = re.compile(r'^sitemap(-[a-z]+-\d+)?\.xml$')
+
+    def get(self, request, name='sitemap.xml'):
+        fullpath = os.path.join(settings.SITEMAP_ROOT, name)
+        if not self.name_re.match(name) or not os.path.isfile(fullpath):
+            raise Http404
+        return file_response(request, fullpath, 'application/xml')
@@ -71,6 +71,24 @@ DATABASES = {
     }
 }
 
+# Кэш общий для всех процессов: сброс лент и счётчиков сигналом
+# должен быть виден каждому воркеру. Кэш в памяти процесса
+# запрещён проверкой blog.E001. Число комментариев кэшируется
+# по ключу на пост, поэтому MAX_ENTRIES рассчитан на все посты,
+# а каталог проверяется на переполнение раз в CULL_EVERY записей
+# (см. blog.cache). На больших установках лучше Redis или memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'blog.cache.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+            'CULL_FREQUENCY': 10,
+            'CULL_EVERY': 100,
+        },
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -117,3 +135,56 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+MEDIA_URL = '/media/'
+
+# None — файлы отдаёт Django, 'x-accel-redirect' — nginx,
+# 'x-sendfile' — Apache mod_xsendfile или lighttpd.
+POST_IMAGE_SENDFILE_BACKEND = None
+
+# internal-location nginx, указывающий на MEDIA_ROOT.
+POST_IMAGE_ACCEL_PREFIX = '/protected-media/'
+
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 25 * 10 ** 6
+
+# Выше этого порога превью строится только для JPEG.
+POST_IMAGE_PLACEHOLDER_MAX_PIXELS = 4 * 10 ** 6
+
+# Как часто (в секундах) индекс подсказок перестраивается целиком,
+# чтобы подхватить изменения из других процессов: новые посты
+# и переименования появляются в них с такой задержкой.
+AUTOCOMPLETE_REFRESH = 300
+
+# Как часто (в секундах) фоновый поток сверяет версию индекса в общем
+# кэше. Скрытые и удалённые посты, категории и пользователи пропадают
+# из подсказок всех процессов не позже чем через это время.
+AUTOCOMPLETE_POLL = 5
+
+AUTOCOMPLETE_LIMIT = 10
+
+# Сколько похожих публикаций считать и показывать под постом.
+RELATED_POSTS_LIMIT = 5
+
+# Сколько секунд хранить готовые RSS/Atom ленты. Раньше их сбрасывает
+# изменение постов и выход отложенной публикации.
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Куда команда build_sitemaps пишет карту сайта.
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+
+# Адрес сайта для абсолютных ссылок в карте сайта.
+SITEMAP_BASE_URL = 'http://127.0.0.1:8000'
+
+# Сколько секунд хранить число комментариев поста. Раньше значение
+# сбрасывают сигналы при изменении комментариев, поста или категории.
+COMMENT_COUNT_CACHE_TIMEOUT = 60 * 60
+
+# Сколько публикаций показывать на странице категории или
+# местоположения в админке; 0 — показывать только их число.
+ADMIN_INLINE_POSTS = 20
+
+# До скольки строк считать список постов и комментариев в админке;
+# больше — показывается «10 000+» или оценка по статистике БД.
+ADMIN_COUNT_CAP = 10_000
@@ -5,3 +5,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Индекс подсказок строится в фоне при старте процесса,
+# а не на первом запросе.
+from blog.autocomplete import index  # noqa: E402
+
+index.start()
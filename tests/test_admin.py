@@ -0,0 +1,280 @@
+import pytest
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+POST_CHANGELIST = '/admin/blog/post/'
+
+
+def changelist_queries(admin_client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url)
+    assert response.status_code == 200
+    return len(queries.captured_queries), response
+
+
+@pytest.mark.django_db
+def test_post_changelist_queries_constant(
+        admin_client, mixer, user, monkeypatch
+):
+    categories = mixer.cycle(3).blend('blog.Category', is_published=True)
+    locations = mixer.cycle(3).blend('blog.Location', is_published=True)
+    mixer.cycle(20).blend(
+        'blog.Post', author=user, text='Очень длинный текст. ' * 100,
+        category=categories[0], location=locations[0],
+    )
+    post_admin = admin.site._registry[Post]
+    counts = []
+    for per_page in (5, 20):
+        monkeypatch.setattr(post_admin, 'list_per_page', per_page)
+        count, response = changelist_queries(admin_client, POST_CHANGELIST)
+        assert len(response.context['cl'].result_list) == per_page
+        counts.append(count)
+    assert counts[0] == counts[1], (
+        'Убедитесь, что число запросов списка постов в админке не зависит '
+        'от числа строк на странице.'
+    )
+    content = response.content.decode()
+    assert 'Очень длинный текст. ' * 10 not in content, (
+        'Убедитесь, что в списке постов показывается только начало текста.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_change_form_uses_autocomplete(admin_client, mixer, user):
+    mixer.cycle(30).blend('blog.Category', title='Категория')
+    post = mixer.blend('blog.Post', author=user)
+    response = admin_client.get(f'{POST_CHANGELIST}{post.id}/change/')
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert content.count('Категория') < 5, (
+        'Убедитесь, что форма поста не выводит все категории в списке.'
+    )
+    for field in ('author', 'category', 'location'):
+        assert f'data-field-name="{field}"' in content, (
+            f'Убедитесь, что поле {field} в форме поста — автодополнение.'
+        )
+
+
+@pytest.mark.django_db
+def test_user_autocomplete(admin_client, mixer):
+    mixer.blend('auth.User', username='shpion')
+    mixer.blend('auth.User', username='agent')
+    response = admin_client.get('/admin/autocomplete/', {
+        'term': 'shp',
+        'app_label': 'blog',
+        'model_name': 'post',
+        'field_name': 'author',
+    })
+    assert response.status_code == 200
+    assert [item['text'] for item in response.json()['results']] == [
+        'shpion'
+    ], 'Убедитесь, что автор поста ищется по началу имени пользователя.'
+
+
+@pytest.mark.django_db
+def test_user_changelist_keeps_default_search(admin_client, mixer):
+    mixer.blend(
+        'auth.User', username='agent', email='Secret@example.com'
+    )
+    response = admin_client.get('/admin/auth/user/', {'q': 'secret'})
+    assert response.status_code == 200
+    assert [user.username for user in response.context['cl'].result_list] == [
+        'agent'
+    ], 'Убедитесь, что в списке пользователей работает обычный поиск.'
+
+
+@pytest.mark.django_db
+def test_category_inline_paginated(admin_client, mixer, user, settings):
+    settings.ADMIN_INLINE_POSTS = 10
+    category = mixer.blend('blog.Category')
+    posts = mixer.cycle(12).blend('blog.Post', author=user, category=category)
+    url = f'/admin/blog/category/{category.id}/change/'
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    formset = response.context['inline_admin_formsets'][0].formset
+    newest = sorted(
+        posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    assert [form.instance for form in formset] == newest[:10], (
+        'Убедитесь, что на странице категории в админке показываются '
+        'только последние публикации.'
+    )
+    assert 'posts_page=2' in response.content.decode()
+    formset = admin_client.get(
+        url, {'posts_page': 2}
+    ).context['inline_admin_formsets'][0].formset
+    assert [form.instance for form in formset] == newest[10:]
+
+
+@pytest.mark.django_db
+def test_category_post_count_mode(admin_client, mixer, user, settings):
+    settings.ADMIN_INLINE_POSTS = 0
+    category = mixer.blend('blog.Category')
+    mixer.cycle(3).blend('blog.Post', author=user, category=category)
+    response = admin_client.get(f'/admin/blog/category/{category.id}/change/')
+    assert response.status_code == 200
+    assert not response.context['inline_admin_formsets']
+    assert f'category__id__exact={category.id}">3</a>' in (
+        response.content.decode()
+    ), 'Убедитесь, что вместо публикаций можно показать их число.'
+
+
+@pytest.mark.django_db
+def test_comment_author_filter_is_input(admin_client, mixer, user):
+    authors = mixer.cycle(30).blend(
+        'auth.User', username=(f'автор{number}' for number in range(30))
+    )
+    post = mixer.blend('blog.Post', author=user)
+    mixer.blend('blog.Comment', post=post, author=authors[0], text='первый')
+    mixer.blend('blog.Comment', post=post, author=authors[1], text='второй')
+    response = admin_client.get('/admin/blog/comment/')
+    assert response.status_code == 200
+    assert response.content.decode().count('автор') < 5, (
+        'Убедитесь, что фильтр комментариев по автору не выводит '
+        'всех пользователей.'
+    )
+    response = admin_client.get(
+        f'/admin/blog/comment/?author={authors[0].username}'
+    )
+    result = list(response.context['cl'].result_list)
+    assert [comment.text for comment in result] == ['первый'], (
+        'Убедитесь, что фильтр по имени автора оставляет его комментарии.'
+    )
+    response = admin_client.get('/admin/blog/comment/?author=нет-такого')
+    assert not response.context['cl'].result_list, (
+        'Убедитесь, что для неизвестного автора список комментариев пуст.'
+    )
+
+
+@pytest.mark.django_db
+def test_category_title_filter(admin_client, mixer):
+    mixer.blend('blog.Category', title='Путешествия')
+    mixer.blend('blog.Category', title='Кулинария')
+    response = admin_client.get('/admin/blog/category/?title=Пут&q=')
+    assert response.status_code == 200
+    titles = [
+        category.title for category in response.context['cl'].result_list
+    ]
+    assert titles == ['Путешествия'], (
+        'Убедитесь, что категории фильтруются по началу заголовка.'
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_unpublish_matching_filter(admin_client, mixer, user):
+    from blog.feeds import FEED_VERSION_KEY, feed_version
+    from django.core.cache import cache
+
+    categories = mixer.cycle(2).blend('blog.Category', is_published=True)
+    posts = mixer.cycle(5).blend(
+        'blog.Post', author=user, is_published=True, category=categories[0]
+    )
+    other = mixer.blend(
+        'blog.Post', author=user, is_published=True, category=categories[1]
+    )
+    version = feed_version()
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.post(
+            f'{POST_CHANGELIST}?category__id__exact={categories[0].id}',
+            {
+                'action': 'unpublish',
+                'select_across': '1',
+                'index': '0',
+                '_selected_action': [posts[0].id],
+            },
+        )
+    assert response.status_code == 302
+    updates = [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE')
+    ]
+    assert len(updates) == 1, (
+        'Убедитесь, что массовое снятие с публикации — один UPDATE.'
+    )
+    assert not Post.objects.filter(
+        category=categories[0], is_published=True
+    ).exists(), (
+        'Убедитесь, что действие снимает с публикации все посты под фильтром.'
+    )
+    other.refresh_from_db()
+    assert other.is_published, (
+        'Убедитесь, что посты вне фильтра не меняются.'
+    )
+    assert cache.get(FEED_VERSION_KEY) != version, (
+        'Убедитесь, что после массового изменения ленты сбрасываются.'
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_publish_selected_comments(admin_client, mixer, user):
+    post = mixer.blend('blog.Post', author=user)
+    comments = mixer.cycle(3).blend(
+        'blog.Comment', post=post, author=user, is_published=False
+    )
+    response = admin_client.post('/admin/blog/comment/', {
+        'action': 'publish',
+        'index': '0',
+        '_selected_action': [comments[0].id, comments[1].id],
+    })
+    assert response.status_code == 302
+    published = [
+        comment.is_published
+        for comment in Comment.objects.order_by('id')
+    ]
+    assert published == [True, True, False], (
+        'Убедитесь, что действие публикует только выбранные комментарии.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_changelist_keyset_navigation(
+        admin_client, mixer, user, monkeypatch, settings
+):
+    settings.ADMIN_COUNT_CAP = 5
+    monkeypatch.setattr(admin.site._registry[Post], 'list_per_page', 3)
+    mixer.cycle(8).blend('blog.Post', author=user)
+    expected = list(
+        Post.objects.order_by('-pub_date', '-id').values_list('id', flat=True)
+    )
+    seen = []
+    url = POST_CHANGELIST
+    with CaptureQueriesContext(connection) as queries:
+        while url:
+            response = admin_client.get(url)
+            assert response.status_code == 200
+            cl = response.context['cl']
+            seen += [post.id for post in cl.result_list]
+            url = cl.keyset_next_url and POST_CHANGELIST + cl.keyset_next_url
+    assert seen == expected, (
+        'Убедитесь, что ссылки «Вперёд» проходят все посты по порядку.'
+    )
+    assert cl.result_count_label == '5+', (
+        'Убедитесь, что число постов в админке считается до ADMIN_COUNT_CAP.'
+    )
+    counts = [
+        query['sql'] for query in queries.captured_queries
+        if 'COUNT(' in query['sql'].upper() and 'blog_post' in query['sql']
+    ]
+    assert counts and all('LIMIT' in sql for sql in counts), (
+        'Убедитесь, что список постов в админке не считает всю таблицу.'
+    )
+    response = admin_client.get(POST_CHANGELIST + cl.keyset_previous_url)
+    assert [post.id for post in response.context['cl'].result_list] == (
+        expected[3:6]
+    ), 'Убедитесь, что ссылка «Назад» открывает предыдущую страницу.'
+
+
+@pytest.mark.django_db
+def test_estimated_count_from_statistics(mixer, user):
+    from blog.changelist import estimated_count
+
+    assert estimated_count(Post) is None
+    mixer.cycle(4).blend('blog.Post', author=user)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    assert estimated_count(Post) == 4, (
+        'Убедитесь, что оценка числа строк берётся из статистики БД.'
+    )
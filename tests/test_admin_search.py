@@ -0,0 +1,64 @@
+import pytest
+
+POST_CHANGELIST = '/admin/blog/post/'
+COMMENT_CHANGELIST = '/admin/blog/comment/'
+
+
+def admin_search(admin_client, url, query):
+    response = admin_client.get(url, {'q': query})
+    assert response.status_code == 200
+    return set(response.context['cl'].result_list)
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title=title, text=text,
+        )
+        for title, text in (
+            ('Признания ШПИОНА', 'Монте-Карло'),
+            ('Дорога', 'Шпионаж и погоня'),
+            ('Кража', 'Крупье украл золотой'),
+        )
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ('query', 'expected'),
+    [
+        ('шпион', {0, 1}),
+        ('ПИОН погон', {1}),
+        ('"монте-карло"', {0}),
+        ('ой', {2}),
+        ('нет такого', set()),
+    ],
+)
+def test_post_admin_search(admin_client, posts, query, expected):
+    assert admin_search(admin_client, POST_CHANGELIST, query) == {
+        posts[index] for index in expected
+    }, (
+        'Убедитесь, что поиск в админке находит подстроки в заголовке и '
+        'тексте поста без учёта регистра.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_admin_search_follows_updates(admin_client, posts):
+    posts[2].text = 'Новый текст'
+    posts[2].save()
+    assert admin_search(admin_client, POST_CHANGELIST, 'крупье') == set()
+    assert admin_search(admin_client, POST_CHANGELIST, 'новый') == {posts[2]}
+
+
+@pytest.mark.django_db
+def test_comment_admin_search(admin_client, mixer, posts, user):
+    comment = mixer.blend(
+        'blog.Comment', post=posts[0], author=user, text='Отличная история'
+    )
+    mixer.blend('blog.Comment', post=posts[0], author=user, text='Скучно')
+    assert admin_search(
+        admin_client, COMMENT_CHANGELIST, 'ИСТОР'
+    ) == {comment}
@@ -0,0 +1,87 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+API_URL = '/api/v1/'
+
+
+def get_json(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что `{url}` доступен.'
+    )
+    return json.loads(b''.join(response.streaming_content))
+
+
+@pytest.mark.django_db
+def test_api_cursor_pagination(mixer, user, published_category, client):
+    posts = mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    expected = sorted(
+        posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    page = get_json(client, f'{API_URL}posts/', limit=2, fields='id,title')
+    ids = [item['id'] for item in page['results']]
+    assert set(page['results'][0]) == {'id', 'title'}, (
+        'Убедитесь, что параметр fields ограничивает поля ответа.'
+    )
+    while page['next']:
+        page = json.loads(b''.join(client.get(page['next']).streaming_content))
+        ids += [item['id'] for item in page['results']]
+    assert ids == [post.id for post in expected], (
+        'Убедитесь, что курсор обходит все посты без пропусков и повторов.'
+    )
+
+
+@pytest.mark.django_db
+def test_api_respects_visibility(
+        mixer, user, another_user_client, user_client, published_category,
+        future_posts, posts_with_unpublished_category
+):
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False,
+    )
+    assert get_json(another_user_client, f'{API_URL}posts/')['results'] == []
+    response = another_user_client.get(f'{API_URL}posts/{hidden.id}/')
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что API не отдаёт снятые с публикации посты.'
+    )
+    response = user_client.get(f'{API_URL}posts/{hidden.id}/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что автор видит свой пост через API.'
+    )
+    profile = get_json(user_client, f'{API_URL}profile/{user.username}/')
+    assert hidden.id in [item['id'] for item in profile['results']]
+    category = posts_with_unpublished_category[0].category
+    response = another_user_client.get(
+        f'{API_URL}category/{category.slug}/'
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_api_etag(mixer, user, published_category, client):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    url = f'{API_URL}posts/{post.id}/'
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что API отвечает 304 на совпадающий ETag.'
+    )
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['title'] == 'Новый заголовок'
+
+
+@pytest.mark.django_db
+def test_api_rejects_bad_params(client):
+    for params in ({'fields': 'password'}, {'cursor': '!'}, {'limit': 0}):
+        response = client.get(f'{API_URL}posts/', params)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
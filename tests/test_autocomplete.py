@@ -0,0 +1,154 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.autocomplete import AutocompleteIndex, index
+
+AUTOCOMPLETE_URL = '/autocomplete/'
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(db, monkeypatch):
+    # Фоновый поток в тестах не нужен: индекс строится здесь.
+    monkeypatch.setattr(index, 'start', lambda: None)
+    index.rebuild()
+
+
+def suggest(client, query):
+    response = client.get(AUTOCOMPLETE_URL, {'q': query})
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что `{AUTOCOMPLETE_URL}` доступен.'
+    )
+    return [item['label'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+def test_autocomplete_prefixes(mixer, user, published_category, client):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Закат над морем',
+    )
+    category = mixer.blend(
+        'blog.Category', title='Морские прогулки', is_published=True
+    )
+    assert suggest(client, 'зака') == ['Закат над морем'], (
+        'Убедитесь, что подсказки находят пост по началу заголовка.'
+    )
+    assert suggest(client, 'мор') == [category.title, 'Закат над морем'], (
+        'Убедитесь, что подсказки находят категории и посты '
+        'по началу любого слова.'
+    )
+    assert suggest(client, f'@{user.username[:3]}') == [
+        f'@{user.username}'
+    ], 'Убедитесь, что запрос с @ ищет пользователей.'
+
+
+@pytest.mark.django_db
+def test_autocomplete_respects_visibility(
+        mixer, user, published_category, client, future_posts,
+        posts_with_unpublished_category
+):
+    for post in (*future_posts, *posts_with_unpublished_category):
+        post.title = 'скрытый пост'
+        post.save()
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='скрытый пост', is_published=False,
+    )
+    assert suggest(client, 'скрыт') == [], (
+        'Убедитесь, что подсказки показывают только опубликованные посты.'
+    )
+
+
+@pytest.mark.django_db
+def test_autocomplete_updates_without_queries(
+        mixer, user, published_category, client
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Первый',
+    )
+    post.title = 'Второй'
+    post.save()
+    with CaptureQueriesContext(connection) as queries:
+        assert suggest(client, 'втор') == ['Второй']
+        assert suggest(client, 'перв') == []
+    assert not [
+        query for query in queries.captured_queries
+        if 'blog_' in query['sql']
+    ], 'Убедитесь, что подсказки не обращаются к таблицам блога.'
+    post.delete()
+    assert suggest(client, 'втор') == [], (
+        'Убедитесь, что удалённый пост пропадает из подсказок.'
+    )
+
+
+@pytest.mark.django_db
+def test_autocomplete_never_builds_in_request(monkeypatch):
+    fresh = AutocompleteIndex()
+    started = []
+    monkeypatch.setattr(fresh, 'start', lambda: started.append(True))
+    with CaptureQueriesContext(connection) as queries:
+        assert fresh.search('пост', 10) == []
+    assert not queries.captured_queries, (
+        'Убедитесь, что поиск подсказок не строит индекс в потоке запроса.'
+    )
+    assert started, (
+        'Убедитесь, что поиск запускает построение индекса в фоне.'
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_keeps_concurrent_updates(
+        mixer, user, published_category, monkeypatch, client
+):
+    snapshot = index._snapshot
+
+    def snapshot_then_save():
+        result = snapshot()
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title='Новый пост',
+        )
+        return result
+
+    monkeypatch.setattr(index, '_snapshot', snapshot_then_save)
+    index.rebuild()
+    assert suggest(client, 'нов') == ['Новый пост'], (
+        'Убедитесь, что изменения, пришедшие во время перестройки '
+        'индекса, не теряются.'
+    )
+
+
+@pytest.mark.django_db
+def test_hidden_post_dropped_in_other_workers(
+        mixer, user, published_category, monkeypatch
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Секретный пост',
+    )
+    # Индекс другого воркера: сигналы этого процесса его не трогают.
+    other_worker = AutocompleteIndex()
+    monkeypatch.setattr(other_worker, 'start', lambda: None)
+    other_worker.rebuild()
+    assert not other_worker.is_stale()
+    post.title = 'Секретный пост, новое название'
+    post.save()
+    assert not other_worker.is_stale(), (
+        'Убедитесь, что правка видимого поста не перестраивает индекс '
+        'во всех процессах.'
+    )
+    post.is_published = False
+    post.save()
+    assert not index.is_stale(), (
+        'Убедитесь, что процесс, скрывший пост, не перестраивает '
+        'свой индекс заново.'
+    )
+    other_worker.refresh()
+    assert other_worker.search('секрет', 10) == [], (
+        'Убедитесь, что скрытый пост пропадает из подсказок '
+        'других процессов после проверки версии.'
+    )
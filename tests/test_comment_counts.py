@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+COUNTS_URL = '/api/v1/comment-counts/'
+
+
+def get_counts(client, ids):
+    response = client.get(COUNTS_URL, {'ids': ','.join(map(str, ids))})
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что `{COUNTS_URL}` доступен.'
+    )
+    return response.json()['counts']
+
+
+@pytest.mark.django_db
+def test_comment_counts(
+        mixer, user, published_category, client, user_client
+):
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False,
+    )
+    mixer.cycle(2).blend('blog.Comment', post=posts[0], author=user)
+    ids = [post.id for post in (*posts, hidden)]
+    with CaptureQueriesContext(connection) as queries:
+        counts = get_counts(client, ids)
+    assert counts == {
+        str(posts[0].id): 2, str(posts[1].id): 0, str(posts[2].id): 0,
+    }, 'Убедитесь, что возвращается число комментариев видимых постов.'
+    assert len(queries.captured_queries) == 1, (
+        'Убедитесь, что число комментариев считается одним запросом.'
+    )
+    assert str(hidden.id) in get_counts(user_client, ids), (
+        'Убедитесь, что автор видит число комментариев своих скрытых постов.'
+    )
+    with CaptureQueriesContext(connection) as queries:
+        get_counts(client, [post.id for post in posts])
+    assert not queries.captured_queries, (
+        'Убедитесь, что значения для видимых постов кэшируются.'
+    )
+    mixer.blend('blog.Comment', post=posts[1], author=user)
+    assert get_counts(client, [posts[1].id]) == {str(posts[1].id): 1}, (
+        'Убедитесь, что новый комментарий сбрасывает кэш.'
+    )
+
+
+@pytest.mark.django_db
+def test_comment_counts_limits(client):
+    for ids in ('', 'a,b', ','.join(map(str, range(1, 500)))):
+        response = client.get(COUNTS_URL, {'ids': ids})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_hidden_post_count_dropped_in_other_workers(
+        mixer, user, published_category, monkeypatch
+):
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import caches
+
+    from blog import counters
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    # Второй экземпляр кэша — как в другом воркере.
+    other_worker = caches.create_connection('default')
+    anonymous = AnonymousUser()
+    monkeypatch.setattr(counters, 'cache', other_worker)
+    assert counters.comment_counts(anonymous, {post.id}) == {post.id: 0}
+    monkeypatch.undo()
+    post.is_published = False
+    post.save()
+    monkeypatch.setattr(counters, 'cache', other_worker)
+    assert counters.comment_counts(anonymous, {post.id}) == {}, (
+        'Убедитесь, что после скрытия поста его число комментариев '
+        'не отдаётся из кэша другого процесса.'
+    )
+
+
+@pytest.mark.django_db
+def test_filling_counts_does_not_scan_cache_dir(
+        mixer, user, published_category, monkeypatch
+):
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+
+    from blog import counters
+
+    posts = mixer.cycle(200).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    scans = []
+    list_files = cache._list_cache_files
+    monkeypatch.setattr(
+        cache, '_list_cache_files',
+        lambda: scans.append(1) or list_files(),
+    )
+    counts = counters.comment_counts(
+        AnonymousUser(), {post.id for post in posts}
+    )
+    assert len(counts) == 200
+    assert len(scans) <= 3, (
+        'Убедитесь, что запись счётчиков в кэш не перечисляет каталог '
+        'кэша на каждый ключ.'
+    )
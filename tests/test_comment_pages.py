@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.mixins import COMMENTS_PAGINATOR
+
+
+@pytest.mark.django_db
+def test_comment_pages(mixer, user, post_with_published_location, client):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PAGINATOR * 2 + 1).blend(
+        'blog.Comment', post=post, author=user,
+    )
+    response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == HTTPStatus.OK
+    shown = list(response.context['comments'])
+    assert shown == comments[:COMMENTS_PAGINATOR], (
+        'Убедитесь, что страница поста показывает только первую '
+        'порцию комментариев, от старых к новым.'
+    )
+    next_url = response.context['next_comments_url']
+    while next_url:
+        response = client.get(f'{next_url}&format=json')
+        assert response.status_code == HTTPStatus.OK
+        page = response.json()
+        shown += [comment['id'] for comment in page['results']]
+        next_url = page['next']
+    assert shown[COMMENTS_PAGINATOR:] == [
+        comment.id for comment in comments[COMMENTS_PAGINATOR:]
+    ], 'Убедитесь, что порции комментариев идут без пропусков и повторов.'
+
+
+@pytest.mark.django_db
+def test_comment_fragment(mixer, user, post_with_published_location, client):
+    post = post_with_published_location
+    mixer.cycle(COMMENTS_PAGINATOR + 1).blend(
+        'blog.Comment', post=post, author=user, text='Комментарий',
+    )
+    next_url = client.get(f'/posts/{post.id}/').context['next_comments_url']
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(next_url)
+    content = response.content.decode()
+    assert content.count('Комментарий') == 1, (
+        'Убедитесь, что фрагмент содержит следующую порцию комментариев.'
+    )
+    assert '<html' not in content
+    assert len(queries.captured_queries) <= 2
+
+
+@pytest.mark.django_db
+def test_comment_page_hidden_post(
+        mixer, user, unpublished_posts_with_published_locations, client
+):
+    post = unpublished_posts_with_published_locations[0]
+    response = client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,47 @@
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+
+@pytest.fixture
+def media_files(tmp_path, post_with_published_location):
+    images = tmp_path / 'post_images'
+    (images / 'old').mkdir(parents=True)
+    for name in ('used.jpg', 'orphan.jpg', 'old/orphan.png'):
+        (images / name).write_bytes(b'image')
+    post_with_published_location.image = 'post_images/used.jpg'
+    post_with_published_location.save()
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        yield images
+
+
+@pytest.mark.django_db
+def test_dry_run_keeps_files(media_files):
+    call_command('compact_media', '--dry-run', '--min-age=0')
+    assert len(list(media_files.rglob('*.*'))) == 3, (
+        'Убедитесь, что в режиме --dry-run файлы не удаляются.'
+    )
+
+
+@pytest.mark.django_db
+def test_orphans_removed(media_files):
+    call_command('compact_media', '--min-age=0')
+    assert [path.name for path in media_files.rglob('*.*')] == ['used.jpg']
+
+
+@pytest.mark.django_db
+def test_orphans_quarantined(media_files, tmp_path):
+    quarantine = tmp_path / 'quarantine'
+    call_command(
+        'compact_media', '--min-age=0', f'--quarantine={quarantine}'
+    )
+    assert (media_files / 'used.jpg').exists()
+    assert (quarantine / 'post_images' / 'old' / 'orphan.png').exists()
+
+
+@pytest.mark.django_db
+def test_recent_files_kept(media_files):
+    call_command('compact_media')
+    assert len(list(media_files.rglob('*.*'))) == 3, (
+        'Убедитесь, что свежие файлы не удаляются.'
+    )
@@ -0,0 +1,82 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.csv_export import csv_rows
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_admin_export_csv_streams_filtered_posts(admin_client, mixer, user):
+    categories = mixer.cycle(2).blend('blog.Category', title='Путешествия')
+    location = mixer.blend('blog.Location', name='Москва')
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=categories[0], location=location
+    )
+    mixer.blend('blog.Post', author=user, category=categories[1])
+    response = admin_client.post(
+        f'/admin/blog/post/?category__id__exact={categories[0].id}',
+        {
+            'action': 'export_csv',
+            'select_across': '1',
+            'index': '0',
+            '_selected_action': [posts[0].id],
+        },
+    )
+    assert response.status_code == 200
+    assert response.streaming, (
+        'Убедитесь, что выгрузка CSV отдаётся потоком.'
+    )
+    content = b''.join(response.streaming_content)
+    assert content.startswith(b'\xef\xbb\xbf'), (
+        'Убедитесь, что CSV начинается с BOM: иначе Excel путает кодировку.'
+    )
+    rows = list(csv.reader(StringIO(content.decode('utf-8-sig'))))
+    assert rows[0][:5] == ['id', 'title', 'author', 'category', 'location']
+    assert sorted(int(row[0]) for row in rows[1:]) == sorted(
+        post.id for post in posts
+    ), 'Убедитесь, что выгружаются все посты под фильтром.'
+    assert {tuple(row[2:5]) for row in rows[1:]} == {
+        (user.username, 'Путешествия', 'Москва')
+    }, 'Убедитесь, что в выгрузке названия, а не номера связанных объектов.'
+
+
+@pytest.mark.django_db
+def test_csv_rows_resolve_names_per_chunk(mixer, user):
+    category = mixer.blend('blog.Category')
+    mixer.cycle(10).blend('blog.Post', author=user, category=category)
+    queryset = Post.objects.order_by('id')
+    with CaptureQueriesContext(connection) as queries:
+        rows = list(csv_rows(queryset, chunk_size=5))
+    assert len(rows) == 11
+    assert len(queries.captured_queries) <= 1 + 2 * 3, (
+        'Убедитесь, что названия связанных объектов читаются одним '
+        'запросом на порцию строк.'
+    )
+
+
+@pytest.mark.django_db
+def test_export_csv_command(mixer, user, tmp_path):
+    post = mixer.blend('blog.Post', author=user)
+    mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+    output = tmp_path / 'comments.csv'
+    call_command('export_csv', 'comments', output=str(output))
+    with open(output, encoding='utf-8-sig', newline='') as file:
+        rows = list(csv.reader(file))
+    assert len(rows) == 3, (
+        'Убедитесь, что команда export_csv выгружает все комментарии.'
+    )
+    assert all(row[2] == user.username for row in rows[1:])
+
+
+@pytest.mark.django_db
+def test_csv_escapes_formulas(mixer, user):
+    mixer.blend('blog.Post', author=user, title='=HYPERLINK("x")', text='-1')
+    rows = list(csv_rows(Post.objects.all()))
+    assert rows[1][1] == '\'=HYPERLINK("x")' and rows[1][-1] == "'-1", (
+        'Убедитесь, что ячейки, похожие на формулу, экранируются.'
+    )
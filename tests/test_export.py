@@ -0,0 +1,48 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+EXPORT_URL = '/profile/export/'
+
+
+def export(client, **params):
+    response = client.get(EXPORT_URL, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что `{EXPORT_URL}` доступен автору.'
+    )
+    assert response.streaming, 'Убедитесь, что выгрузка отдаётся потоком.'
+    return [
+        json.loads(line)
+        for line in b''.join(response.streaming_content).splitlines()
+    ]
+
+
+@pytest.mark.django_db
+def test_export_posts_and_comments(
+        mixer, user, another_user, user_client, published_category
+):
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False,
+    )
+    mixer.blend('blog.Post', author=another_user, category=published_category)
+    comment = mixer.blend('blog.Comment', post=posts[0], author=user)
+    mixer.blend('blog.Comment', post=posts[0], author=another_user)
+    items = export(user_client)
+    assert [(item['type'], item['id']) for item in items] == [
+        *(('post', post.id) for post in posts),
+        ('comment', comment.id),
+    ], 'Убедитесь, что выгружаются все посты и комментарии автора.'
+    resumed = export(user_client, cursor=items[1]['cursor'])
+    assert resumed == items[2:], (
+        'Убедитесь, что выгрузку можно продолжить с курсора.'
+    )
+
+
+@pytest.mark.django_db
+def test_export_requires_login(client, user_client):
+    response = client.get(EXPORT_URL)
+    assert response.status_code == HTTPStatus.FOUND
+    response = user_client.get(EXPORT_URL, {'cursor': 'user:1'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
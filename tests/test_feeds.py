@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('feed', ('rss', 'atom'))
+def test_feeds_list_visible_posts(
+        mixer, user, published_category, client, feed,
+        future_posts, posts_with_unpublished_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Видимый пост',
+    )
+    hidden_titles = [
+        hidden.title
+        for hidden in (*future_posts, *posts_with_unpublished_category)
+    ]
+    for url in (
+        f'/{feed}/',
+        f'/category/{published_category.slug}/{feed}/',
+        f'/profile/{user.username}/{feed}/',
+    ):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Убедитесь, что лента `{url}` доступна.'
+        )
+        content = response.content.decode()
+        assert post.title in content, (
+            f'Убедитесь, что лента `{url}` содержит опубликованные посты.'
+        )
+        assert not any(title in content for title in hidden_titles), (
+            f'Убедитесь, что лента `{url}` не содержит скрытых постов.'
+        )
+
+
+@pytest.mark.django_db
+def test_feed_cache_and_conditional_get(
+        mixer, user, published_category, client
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    etag = client.get('/rss/')['ETag']
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что лента отвечает 304 на совпадающий ETag.'
+    )
+    assert not response.content
+    assert not queries.captured_queries, (
+        'Убедитесь, что лента отдаётся из кэша без запросов к БД.'
+    )
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get('/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что кэш ленты сбрасывается при изменении поста.'
+    )
+    assert 'Новый заголовок' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_feed_missing_objects(client):
+    assert client.get('/category/missing/rss/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get('/profile/missing/atom/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.django_db
+def test_feed_shows_renamed_author(mixer, user, published_category, client):
+    mixer.blend('blog.Post', author=user, category=published_category)
+    client.get('/rss/')
+    user.username = 'новое_имя'
+    user.save()
+    assert 'новое_имя' in client.get('/rss/').content.decode(), (
+        'Убедитесь, что ленты сбрасываются при изменении имени автора.'
+    )
+
+
+def test_local_memory_cache_is_rejected(settings):
+    from blog.checks import check_shared_cache
+
+    assert check_shared_cache(None) == []
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert [error.id for error in check_shared_cache(None)] == [
+        'blog.E001'
+    ], 'Убедитесь, что кэш в памяти процесса не проходит проверку.'
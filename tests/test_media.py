@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+IMAGE_NAME = 'post_images/image.jpg'
+IMAGE_BYTES = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    (tmp_path / 'post_images').mkdir()
+    (tmp_path / IMAGE_NAME).write_bytes(IMAGE_BYTES)
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        yield tmp_path
+
+
+@pytest.fixture
+def post_with_image(media_root, post_with_published_location):
+    post_with_published_location.image = IMAGE_NAME
+    post_with_published_location.save()
+    return post_with_published_location
+
+
+def read(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_full_and_conditional(client, post_with_image):
+    url = post_with_image.image.url
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert read(response) == IMAGE_BYTES
+    assert response['Accept-Ranges'] == 'bytes'
+    assert response['Cache-Control'] == 'public'
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что при совпадении ETag возвращается статус 304.'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ('header', 'expected', 'content_range'),
+    [
+        ('bytes=0-9', IMAGE_BYTES[:10], 'bytes 0-9/1024'),
+        ('bytes=1000-', IMAGE_BYTES[1000:], 'bytes 1000-1023/1024'),
+        ('bytes=-4', IMAGE_BYTES[-4:], 'bytes 1020-1023/1024'),
+    ],
+)
+def test_range(client, post_with_image, header, expected, content_range):
+    response = client.get(post_with_image.image.url, HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response['Content-Range'] == content_range
+    assert int(response['Content-Length']) == len(expected)
+    assert read(response) == expected
+
+
+@pytest.mark.django_db
+def test_unsatisfiable_range(client, post_with_image):
+    response = client.get(post_with_image.image.url, HTTP_RANGE='bytes=5000-')
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response['Content-Range'] == 'bytes */1024'
+
+
+@pytest.mark.django_db
+def test_unpublished_post_image(
+        user_client, another_user_client, post_with_image
+):
+    post_with_image.is_published = False
+    post_with_image.save()
+    url = post_with_image.image.url
+    assert another_user_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что изображение снятого с публикации поста недоступно '
+        'другим пользователям.'
+    )
+    response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Cache-Control'] == 'private'
+
+
+@pytest.mark.django_db
+def test_unknown_file(client, media_root):
+    response = client.get('/media/post_images/image.jpg')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_SENDFILE_BACKEND='x-accel-redirect')
+def test_accel_redirect(client, post_with_image):
+    response = client.get(post_with_image.image.url)
+    assert response['X-Accel-Redirect'] == '/protected-media/' + IMAGE_NAME
+    assert response.content == b''
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'backend', ['x-accel-redirect', 'x-sendfile']
+)
+def test_sendfile_non_ascii_name(client, post_with_image, media_root,
+                                 backend):
+    name = 'post_images/фото 1.jpg'
+    (media_root / name).write_bytes(IMAGE_BYTES)
+    post_with_image.image = name
+    post_with_image.save()
+    with override_settings(POST_IMAGE_SENDFILE_BACKEND=backend):
+        response = client.get(post_with_image.image.url)
+    header = response[
+        'X-Accel-Redirect' if backend == 'x-accel-redirect' else 'X-Sendfile'
+    ]
+    assert header.isascii() and '=?utf-8?' not in header, (
+        'Убедитесь, что путь для фронтенд-сервера передаётся '
+        'в процентной кодировке.'
+    )
+    assert header.endswith('/post_images/%D1%84%D0%BE%D1%82%D0%BE%201.jpg')
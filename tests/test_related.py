@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import RelatedPost
+
+
+def related_titles(client, post):
+    response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == HTTPStatus.OK
+    return [related.title for related in response.context['related_posts']]
+
+
+@pytest.mark.django_db
+def test_related_posts_by_text(mixer, user, published_category, client):
+    def blend(title, text):
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title=title, text=text,
+        )
+
+    post = blend('Горные походы', 'Палатка, рюкзак и горные тропы.')
+    blend('Поход в горы', 'Взяли палатку и рюкзак на тропу.')
+    blend('Рецепт пирога', 'Мука, яйца и сахар.')
+    blend('Выпечка', 'Пирог с яблоками: мука и сахар.')
+    call_command('build_related_posts', limit=1)
+    assert RelatedPost.objects.count() == 4, (
+        'Убедитесь, что команда build_related_posts сохраняет '
+        'соседей для каждого поста.'
+    )
+    assert related_titles(client, post) == ['Поход в горы'], (
+        'Убедитесь, что похожие публикации подбираются по словам '
+        'заголовка и текста.'
+    )
+
+
+@pytest.mark.django_db
+def test_related_posts_respect_visibility(
+        mixer, user, published_category, client, future_posts
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Закат', text='закат над морем',
+    )
+    for future in future_posts:
+        future.text = 'закат над морем'
+        future.save()
+    call_command('build_related_posts')
+    assert related_titles(client, post) == [], (
+        'Убедитесь, что среди похожих публикаций нет отложенных постов.'
+    )
+    with CaptureQueriesContext(connection) as queries:
+        related_titles(client, post)
+    assert sum(
+        'blog_relatedpost' in query['sql']
+        for query in queries.captured_queries
+    ) == 1, 'Убедитесь, что похожие публикации читаются одним запросом.'
+
+
+def test_postings_are_capped(monkeypatch):
+    from blog import related
+
+    monkeypatch.setattr(related, 'MAX_POSTINGS', 3)
+    monkeypatch.setattr(related, 'MAX_DF_RATIO', 1)
+    rows = [
+        (pk, 'закат', 'закат ' * pk + f'слово{pk}') for pk in range(1, 11)
+    ]
+    index = related.TfidfIndex().build(rows)
+    assert all(
+        len(documents) <= 3 for documents, _ in index.postings.values()
+    ), 'Убедитесь, что длина списков постов терма ограничена.'
+    neighbours = index.neighbours(0, len(rows), 2)
+    assert set(neighbours) == set(range(len(rows)))
+    assert all(len(found) <= 2 for found in neighbours.values())
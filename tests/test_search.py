@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from conftest import N_PER_PAGE
+
+SEARCH_URL = '/search/'
+
+
+def search(client, query, **params):
+    response = client.get(SEARCH_URL, {'q': query, **params})
+    assert response.status_code == HTTPStatus.OK, (
+        f'Убедитесь, что страница поиска `{SEARCH_URL}` доступна.'
+    )
+    return list(response.context['page_obj'])
+
+
+@pytest.mark.django_db
+def test_search_finds_title_and_text(mixer, user, published_category, client):
+    by_title = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Закат над морем', text='Без слов',
+    )
+    by_text = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Прогулка', text='Видели закат и чаек',
+    )
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Рассвет', text='Утро',
+    )
+    found = search(client, 'закат')
+    assert set(found) == {by_title, by_text}, (
+        'Убедитесь, что поиск ищет по заголовку и тексту поста.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_respects_visibility(
+        mixer, user, published_category, client, future_posts,
+        posts_with_unpublished_category
+):
+    for post in (*future_posts, *posts_with_unpublished_category):
+        post.text = 'скрытый пост'
+        post.save()
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        text='скрытый пост', is_published=False,
+    )
+    assert search(client, 'скрытый') == [], (
+        'Убедитесь, что поиск показывает только опубликованные посты.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_changes(mixer, user, published_category, client):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Старый заголовок', text='Текст',
+    )
+    post.title = 'Новый заголовок'
+    post.save()
+    assert search(client, 'старый') == []
+    assert search(client, 'новый') == [post]
+    post.delete()
+    assert search(client, 'новый') == []
+
+
+@pytest.mark.django_db
+def test_search_paginated(mixer, user, published_category, client):
+    mixer.cycle(N_PER_PAGE + 2).blend(
+        'blog.Post', author=user, category=published_category,
+        text='пагинация',
+    )
+    assert len(search(client, 'пагинация')) == N_PER_PAGE
+    assert len(search(client, 'пагинация', page=2)) == 2
+
+
+@pytest.mark.django_db
+def test_search_operators_are_escaped(client):
+    assert search(client, '"OR (NEAR*') == []
+    assert search(client, '') == []
+
+
+@pytest.mark.django_db
+def test_search_matches_word_forms(mixer, user, published_category, client):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Новые публикации', text='Признания шпиона',
+    )
+    assert search(client, 'публикация') == [post], (
+        'Убедитесь, что поиск находит другие формы слова.'
+    )
+    assert search(client, 'шпионы') == [post]
+
+
+@pytest.mark.django_db
+def test_missing_terms_filled_after_migrate(
+        mixer, user, published_category, client
+):
+    from django.core.management import call_command
+    from django.db import connection
+
+    from blog.search import FTS_TABLE
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Новые публикации', text='Признания шпиона',
+    )
+    # Так строки выглядят сразу после миграции 0011.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {FTS_TABLE} SET title_terms = NULL, text_terms = NULL'
+        )
+    assert search(client, 'публикация') == []
+    call_command('migrate', verbosity=0)
+    assert search(client, 'публикация') == [post], (
+        'Убедитесь, что после миграций основы слов в поисковом индексе '
+        'заполняются.'
+    )
+
+
+@pytest.mark.django_db
+def test_search_snippets_highlight_matches(
+        mixer, user, published_category, client
+):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Прогулка у моря',
+        text='Начало. ' + 'слово ' * 50 + 'Видели закаты <b>и</b> чаек.',
+    )
+    response = client.get(SEARCH_URL, {'q': 'закат'})
+    content = response.content.decode()
+    assert '<mark>закаты</mark>' in content, (
+        'Убедитесь, что в результатах поиска совпадения подсвечены.'
+    )
+    assert '&lt;b&gt;и&lt;/b&gt;' in content, (
+        'Убедитесь, что текст сниппета экранируется.'
+    )
+    assert 'Начало.' not in content, (
+        'Убедитесь, что сниппет берётся из фрагмента с совпадением.'
+    )
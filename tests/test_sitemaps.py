@@ -0,0 +1,66 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from blog import sitemaps
+from blog.models import Category
+
+
+@pytest.fixture
+def sitemap_root(settings, tmp_path):
+    settings.SITEMAP_ROOT = tmp_path
+    settings.SITEMAP_BASE_URL = 'https://example.com'
+    return tmp_path
+
+
+def locations(content):
+    return re.findall(r'<loc>([^<]+)</loc>', content)
+
+
+@pytest.mark.django_db
+def test_sitemap_shards(
+        mixer, user, published_category, client, sitemap_root, monkeypatch,
+        future_posts, posts_with_unpublished_category
+):
+    monkeypatch.setattr(sitemaps, 'SHARD_SIZE', 2)
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+    )
+    call_command('build_sitemaps')
+    response = client.get('/sitemap.xml')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что индекс карты сайта доступен по `/sitemap.xml`.'
+    )
+    shards = locations(b''.join(response.streaming_content).decode())
+    urls = []
+    for shard in shards:
+        response = client.get(shard.replace('https://example.com', ''))
+        assert response.status_code == HTTPStatus.OK
+        shard_urls = locations(b''.join(response.streaming_content).decode())
+        assert len(shard_urls) <= 2, (
+            'Убедитесь, что в файле карты сайта не больше SHARD_SIZE адресов.'
+        )
+        urls += shard_urls
+    assert sorted(urls) == sorted([
+        *(f'https://example.com/posts/{post.id}/' for post in posts),
+        *(
+            f'https://example.com/category/{category.slug}/'
+            for category in Category.objects.filter(is_published=True)
+        ),
+        f'https://example.com/profile/{user.username}/',
+    ]), 'Убедитесь, что в карте сайта только видимые страницы.'
+
+
+@pytest.mark.django_db
+def test_sitemap_removes_stale_shards(client, sitemap_root):
+    (sitemap_root / 'sitemap-posts-9.xml').write_text('old')
+    call_command('build_sitemaps')
+    assert not (sitemap_root / 'sitemap-posts-9.xml').exists()
+    assert client.get('/sitemaps/sitemap-posts-9.xml').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get('/sitemaps/..%2Fsettings.py').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment, DailyAuthorStats, DailyStats, Post
+from blog.stats import aggregate_stats, resample
+
+STATS_URL = '/admin/blog/dailystats/'
+
+
+def set_created_at(model, objects, moment):
+    model.objects.filter(pk__in=[obj.pk for obj in objects]).update(
+        created_at=moment
+    )
+
+
+@pytest.mark.django_db
+def test_aggregate_stats_incremental(mixer, user):
+    now = timezone.now()
+    category = mixer.blend('blog.Category')
+    old_posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=category
+    )
+    set_created_at(Post, old_posts, now - timedelta(days=3))
+    comments = mixer.cycle(2).blend(
+        'blog.Comment', post=old_posts[0], author=user
+    )
+    set_created_at(Comment, comments, now - timedelta(days=3))
+    call_command('aggregate_stats')
+    day = (now - timedelta(days=3)).date()
+    assert list(DailyStats.objects.values_list(
+        'day', 'posts', 'comments'
+    )) == [(day, 3, 2)], (
+        'Убедитесь, что команда aggregate_stats считает посты и '
+        'комментарии по дням.'
+    )
+    mixer.cycle(2).blend('blog.Post', author=user, category=category)
+    aggregate_stats()
+    Post.objects.filter(pk=old_posts[1].pk).delete()
+    aggregate_stats()
+    assert list(DailyStats.objects.values_list('posts', flat=True)) == [
+        3, 2
+    ], 'Убедитесь, что пересчитываются только последние дни.'
+    aggregate_stats(full=True)
+    assert list(DailyStats.objects.values_list('posts', flat=True)) == [
+        2, 2
+    ], 'Убедитесь, что --full пересчитывает всю историю.'
+    assert DailyAuthorStats.objects.filter(author=user).count() == 2
+
+
+def test_resample_keeps_total():
+    series = list(range(1000))
+    points = resample(series, 365)
+    assert len(points) <= 365
+    assert sum(points) == sum(series)
+
+
+@pytest.mark.django_db
+def test_stats_page_reads_rollups(admin_client, mixer, user):
+    category = mixer.blend('blog.Category', title='Путешествия')
+    mixer.cycle(4).blend('blog.Post', author=user, category=category)
+    aggregate_stats()
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(STATS_URL + '?period=all')
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert '<polyline' in content
+    assert user.username in content and 'Путешествия' in content, (
+        'Убедитесь, что на странице статистики есть самые активные '
+        'авторы и категории.'
+    )
+    assert not any(
+        'blog_post' in query['sql'] for query in queries.captured_queries
+    ), 'Убедитесь, что страница статистики не считает посты на лету.'
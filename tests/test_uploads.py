@@ -0,0 +1,187 @@
+from base64 import b64decode
+from io import BytesIO
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from blog.forms import PostForm
+from blog.models import Post
+
+EXIF_MAKE_TAG = 0x010F
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def make_upload(image_format, size=(120, 80), exif=None, **params):
+    buffer = BytesIO()
+    if exif is not None:
+        params['exif'] = exif.tobytes()
+    Image.new('RGB', size, 'red').save(buffer, image_format, **params)
+    return SimpleUploadedFile(
+        f'image.{image_format.lower()}', buffer.getvalue()
+    )
+
+
+def clean_image(upload):
+    return PostForm.base_fields['image'].clean(upload)
+
+
+@pytest.mark.parametrize('image_format', ['JPEG', 'PNG'])
+def test_exif_is_stripped(image_format):
+    exif = Image.Exif()
+    exif[EXIF_MAKE_TAG] = 'Camera'
+    exif[EXIF_ORIENTATION_TAG] = 6
+    image = clean_image(make_upload(image_format, exif=exif))
+    stored = Image.open(BytesIO(b''.join(image.chunks(chunk_size=100))))
+    stored.load()
+    assert stored.size == (120, 80), (
+        'Убедитесь, что после удаления метаданных изображение не повреждено.'
+    )
+    assert EXIF_MAKE_TAG not in stored.getexif(), (
+        'Убедитесь, что при сохранении изображения удаляются EXIF-данные.'
+    )
+    if image_format == 'JPEG':
+        assert stored.getexif().get(EXIF_ORIENTATION_TAG) == 6, (
+            'Убедитесь, что у JPEG сохраняется тег ориентации.'
+        )
+
+
+@override_settings(POST_IMAGE_MAX_PIXELS=100 * 100)
+def test_pixel_limit():
+    with pytest.raises(ValidationError) as error:
+        clean_image(make_upload('JPEG', size=(200, 200)))
+    assert error.value.code == 'too_many_pixels'
+
+
+@override_settings(POST_IMAGE_MAX_BYTES=10)
+def test_byte_limit():
+    with pytest.raises(ValidationError) as error:
+        clean_image(make_upload('PNG'))
+    assert error.value.code == 'file_too_large'
+
+
+def test_gif_comment_is_stripped():
+    image = clean_image(make_upload('GIF', comment=b'secret', loop=0))
+    data = b''.join(image.chunks(chunk_size=100))
+    stored = Image.open(BytesIO(data))
+    stored.load()
+    assert stored.size == (120, 80), (
+        'Убедитесь, что после удаления метаданных GIF не повреждён.'
+    )
+    assert b'secret' not in data, (
+        'Убедитесь, что из GIF удаляются комментарии.'
+    )
+    assert stored.info.get('loop') == 0, (
+        'Убедитесь, что у GIF сохраняется число повторов анимации.'
+    )
+
+
+def test_invalid_image():
+    with pytest.raises(ValidationError) as error:
+        clean_image(SimpleUploadedFile('image.jpg', b'not an image'))
+    assert error.value.code == 'invalid_image'
+
+
+@pytest.mark.parametrize('image_format', ['WEBP', 'TIFF'])
+def test_unsupported_format(image_format):
+    exif = Image.Exif()
+    exif[EXIF_MAKE_TAG] = 'Camera'
+    with pytest.raises(ValidationError) as error:
+        clean_image(make_upload(image_format, exif=exif))
+    assert error.value.code == 'invalid_image', (
+        'Убедитесь, что форматы, из которых не вырезаются метаданные, '
+        'не принимаются.'
+    )
+
+
+@pytest.mark.parametrize('image_format', ['JPEG', 'PNG', 'GIF'])
+def test_truncated_image(image_format):
+    upload = make_upload(image_format)
+    upload = SimpleUploadedFile(upload.name, upload.read()[:41])
+    with pytest.raises(ValidationError) as error:
+        clean_image(upload)
+    assert error.value.code == 'invalid_image', (
+        'Убедитесь, что обрезанное изображение не проходит проверку.'
+    )
+
+
+@pytest.mark.django_db
+def test_truncated_image_not_saved(user_client, published_category, tmp_path):
+    upload = make_upload('PNG')
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        response = user_client.post('/posts/create/', {
+            'title': 'Заголовок',
+            'text': 'Текст',
+            'pub_date': '2020-01-01T10:00',
+            'category': published_category.id,
+            'image': SimpleUploadedFile('a.png', upload.read()[:41]),
+        })
+    assert response.status_code == 200
+    assert 'image' in response.context['form'].errors
+    assert not any(tmp_path.rglob('*.png')), (
+        'Убедитесь, что обрезанное изображение не сохраняется на диск.'
+    )
+
+
+@pytest.mark.django_db
+def test_placeholder_saved(user, published_category, tmp_path):
+    data = {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T10:00',
+        'category': published_category.id,
+    }
+    form = PostForm(data, {'image': make_upload('JPEG', size=(640, 480))})
+    assert form.is_valid(), form.errors
+    form.instance.author = user
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        post = form.save()
+    assert post.image_placeholder.startswith('data:image/png;base64,'), (
+        'Убедитесь, что при загрузке изображения сохраняется его превью.'
+    )
+    preview = Image.open(BytesIO(
+        b64decode(post.image_placeholder.split(',', 1)[1])
+    ))
+    assert max(preview.size) <= 16
+
+    form = PostForm(
+        {**data, 'image-clear': 'on'}, instance=post
+    )
+    assert form.is_valid(), form.errors
+    assert form.save().image_placeholder == ''
+
+
+@pytest.mark.django_db
+def test_admin_image_updates_placeholder(
+        admin_client, user, published_category, tmp_path
+):
+    data = {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'author': user.id,
+        'is_published': 'on',
+        'pub_date_0': '2020-01-01',
+        'pub_date_1': '10:00',
+        'category': published_category.id,
+    }
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        response = admin_client.post('/admin/blog/post/add/', {
+            **data, 'image': make_upload('JPEG', size=(640, 480)),
+        })
+        assert response.status_code == 302, response.context['errors']
+        post = Post.objects.get()
+        assert post.image_placeholder.startswith('data:image/png;base64,'), (
+            'Убедитесь, что превью изображения считается и в админке.'
+        )
+        response = admin_client.post(
+            f'/admin/blog/post/{post.id}/change/',
+            {**data, 'image-clear': 'on'},
+        )
+        assert response.status_code == 302
+    post.refresh_from_db()
+    assert not post.image and post.image_placeholder == '', (
+        'Убедитесь, что при удалении изображения в админке сбрасывается '
+        'и его превью.'
+    )